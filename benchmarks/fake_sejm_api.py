@@ -0,0 +1,139 @@
+import asyncio
+import datetime
+import hashlib
+import random
+import socket
+from aiohttp import web
+
+
+class FakeSejmApi:
+    """
+    Local stand-in for the /prints and /processes endpoints of the Sejm API.
+
+    Serves a generated term of prints with the same document shape, sorting,
+    paging and conditional-request behaviour the bot relies on.
+
+    Args:
+        print_count (int): Number of prints in the generated term.
+        latency (float): Seconds added to every response.
+        error_rate (float): Fraction of requests answered with HTTP 503.
+        changed_fraction (float): Fraction of prints whose change date is
+            moved forward by touch().
+        seed (int): Seed for the generated data and the injected errors.
+    """
+
+    def __init__(
+        self, print_count, latency=0.0, error_rate=0.0, changed_fraction=0.01, seed=0
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.changed_fraction = changed_fraction
+        self.requests = 0
+        self._random = random.Random(seed)
+        # Prints are spread over the last 700 days, the newest delivered today.
+        start = datetime.date.today() - datetime.timedelta(days=700)
+        self.prints = {}
+        for i in range(1, print_count + 1):
+            delivered = start + datetime.timedelta(days=i * 700 // print_count)
+            self.prints[str(i)] = {
+                "number": str(i),
+                "title": f"Rządowy projekt ustawy o zmianie ustawy nr {i} o podatkach",
+                "deliveryDate": delivered.isoformat(),
+                "changeDate": f"{delivered.isoformat()}T12:00:00",
+                "documentDate": delivered.isoformat(),
+                "attachments": [f"{i}.pdf"],
+                "processPrint": [str(i)],
+            }
+        self._runner = None
+
+    def touch(self, now=None):
+        """
+        Moves the change date of a fraction of the prints forward.
+
+        By default the new change date is a day after the newest one, so
+        the touched prints lead the "-changeDate" feed.
+
+        Returns:
+            list: The numbers of the touched prints.
+        """
+        if now is None:
+            newest = max(item["changeDate"] for item in self.prints.values())
+            now = (
+                datetime.datetime.fromisoformat(newest) + datetime.timedelta(days=1)
+            ).isoformat()
+        numbers = list(self.prints)
+        count = max(1, int(len(numbers) * self.changed_fraction))
+        touched = self._random.sample(numbers, count)
+        for print_nr in touched:
+            self.prints[print_nr]["changeDate"] = now
+        return touched
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Starts serving and returns the base URL (".../sejm/term10")."""
+        app = web.Application()
+        app.router.add_get("/sejm/term10/prints", self._list_prints)
+        app.router.add_get("/sejm/term10/prints/{nr}", self._get_print)
+        app.router.add_get("/sejm/term10/processes/{nr}", self._get_process)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        # Bind first so that port 0 picks a free port we can report.
+        sock = socket.socket()
+        sock.bind((host, port))
+        await web.SockSite(self._runner, sock).start()
+        return f"http://{host}:{sock.getsockname()[1]}/sejm/term10"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _respond(self):
+        """Applies latency and injected errors; returns an error response or None."""
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.Response(status=503)
+        return None
+
+    async def _list_prints(self, request):
+        error = await self._respond()
+        if error is not None:
+            return error
+        sort_by = request.query.get("sort_by", "")
+        field = sort_by.lstrip("-") or "number"
+        items = sorted(
+            self.prints.values(),
+            key=lambda item: item.get(field, ""),
+            reverse=sort_by.startswith("-"),
+        )
+        offset = int(request.query.get("offset", 0))
+        limit = int(request.query.get("limit", len(items)))
+        return web.json_response(items[offset : offset + limit])
+
+    async def _get_print(self, request):
+        error = await self._respond()
+        if error is not None:
+            return error
+        print_item = self.prints.get(request.match_info["nr"])
+        if print_item is None:
+            return web.Response(status=404)
+        etag = '"' + hashlib.md5(print_item["changeDate"].encode()).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.json_response(print_item, headers={"ETag": etag})
+
+    async def _get_process(self, request):
+        error = await self._respond()
+        if error is not None:
+            return error
+        print_item = self.prints.get(request.match_info["nr"])
+        if print_item is None:
+            return web.Response(status=404)
+        return web.json_response(
+            {
+                "number": print_item["number"],
+                "title": print_item["title"],
+                "passed": False,
+                "stages": [{"stageName": "Skierowanie do I czytania"}],
+            }
+        )
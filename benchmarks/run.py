@@ -0,0 +1,402 @@
+"""
+Benchmarks of the watch cycle, report generation and watch store writes
+against a local fake of the Sejm API.
+
+Run from the repository root:
+
+    python -m benchmarks.run --sizes 1000 10000 100000
+
+Results are written to benchmarks/results/<timestamp>.json and compared
+with the previous run, so regressions show up as slower timings.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import glob
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from benchmarks.fake_sejm_api import FakeSejmApi
+from src.utils import file_operations
+from src.utils.change_detector import PrintChangeDetector
+from src.utils.http_client import create_http_session
+from src.utils.outbox import Outbox
+from src.utils.rate_limit import HostRateLimiter
+from src.utils.sejm_api import SejmApi
+from src.utils.subscriptions import SubscriptionTable
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+PRINTS_PER_USER = 10
+
+
+@contextlib.contextmanager
+def isolated_store(tmp_dir, backend):
+    """Points the watch store at a temporary directory."""
+    paths = {
+        "WATCHED_PRINTS_FILE": os.path.join(tmp_dir, "watched_prints.json"),
+        "WATCH_STORE_DB_FILE": os.path.join(tmp_dir, "watched_prints.sqlite3"),
+        "WATCHER_STATE_FILE": os.path.join(tmp_dir, "watcher_state.json"),
+        "REPORT_CHANNELS_FILE": os.path.join(tmp_dir, "report_channels.json"),
+    }
+    with patch.multiple(file_operations, **paths):
+        file_operations.watched_prints.clear()
+        file_operations.init_store(backend)
+        try:
+            yield
+        finally:
+            file_operations.close_store()
+            file_operations.enable_write_behind(False)
+            file_operations.watched_prints.clear()
+
+
+@contextlib.contextmanager
+def fake_endpoints(base_url):
+    """Sends SejmApi requests to the fake API."""
+    with patch.multiple(
+        "src.utils.sejm_api",
+        PRINTS_ENDPOINT=f"{base_url}/prints",
+        PROCESSES_ENDPOINT=f"{base_url}/processes",
+    ):
+        yield
+
+
+def make_subscriptions(fake, subscriptions, prints_per_user=PRINTS_PER_USER):
+    """Spreads subscriptions over the fake's prints, prints_per_user per user."""
+    numbers = list(fake.prints)
+    watched = {}
+    for i in range(subscriptions):
+        user_id = str(100000 + i // prints_per_user)
+        print_nr = numbers[(i * 7919) % len(numbers)]
+        watched.setdefault(user_id, {})[print_nr] = fake.prints[print_nr]["changeDate"]
+    return watched
+
+
+@contextlib.contextmanager
+def adaptive_checks_due(detector):
+    """
+    Moves the adaptive schedule's clock to when every print is due.
+
+    Right after the cold cycle nothing is due, so the warm cycle would
+    measure an idle tick rather than a check of the watched prints.
+    """
+    if detector.strategy != "adaptive":
+        yield
+        return
+    due_at = max(next_check for next_check, _ in detector.schedule.to_state().values())
+    with patch("src.utils.change_detector.time.time", return_value=due_at):
+        yield
+
+
+async def bench_watch_cycle(args, subscriptions, strategy):
+    """Measures a cold and a warm watch cycle for a number of subscriptions."""
+    fake = FakeSejmApi(
+        args.prints,
+        latency=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        changed_fraction=args.changed_fraction,
+    )
+    base_url = await fake.start()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The JSON file is imported by the sqlite store on init.
+        with open(os.path.join(tmp_dir, "watched_prints.json"), "w") as f:
+            json.dump(make_subscriptions(fake, subscriptions), f)
+        session = create_http_session()
+        outbox = Outbox(os.path.join(tmp_dir, "outbox.sqlite3"))
+        try:
+            with isolated_store(tmp_dir, "sqlite"), fake_endpoints(base_url):
+                subscribers = file_operations.get_print_subscribers()
+                distinct_prints = len(subscribers)
+                api = SejmApi(session)
+                api.rate_limiter = HostRateLimiter(args.api_rate)
+                detector = PrintChangeDetector(api, outbox, strategy)
+
+                start = time.perf_counter()
+                await detector.run_cycle()
+                cold_seconds = time.perf_counter() - start
+
+                # Cycles are hours apart, so nothing is served from the cache.
+                touched = fake.touch()
+                api.cache.clear()
+                requests_before = fake.requests
+                with adaptive_checks_due(detector):
+                    start = time.perf_counter()
+                    notifications = await detector.run_cycle()
+                    warm_seconds = time.perf_counter() - start
+
+                # Every watcher of a touched print is notified once; injected
+                # errors may leave some of them for the next cycle.
+                expected = sum(len(subscribers.get(nr, ())) for nr in touched)
+                if not args.error_rate and notifications != expected:
+                    raise AssertionError(
+                        f"{strategy} warm cycle queued {notifications} "
+                        f"notifications, expected {expected}"
+                    )
+        finally:
+            outbox.close()
+            await session.close()
+            await fake.stop()
+
+    return {
+        "subscriptions": subscriptions,
+        "distinct_prints": distinct_prints,
+        "cold_seconds": cold_seconds,
+        "seconds": warm_seconds,
+        "prints_per_second": distinct_prints / warm_seconds,
+        "requests": fake.requests - requests_before,
+        "notifications": notifications,
+    }
+
+
+async def bench_report(args, print_count):
+    """Measures generating a report covering print_count prints."""
+    # Imported here so that the other benchmarks do not need discord.py.
+    from src.cogs.reports import Reports
+
+    fake = FakeSejmApi(print_count, latency=args.latency_ms / 1000)
+    base_url = await fake.start()
+    session = create_http_session()
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir, isolated_store(
+            tmp_dir, "sqlite"
+        ), fake_endpoints(base_url):
+            api = SejmApi(session)
+            api.rate_limiter = HostRateLimiter(args.api_rate)
+            reports = Reports(None, api, None)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            messages = await reports._generate_report(800)
+            seconds = time.perf_counter() - start
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            start = time.perf_counter()
+            await reports._generate_report(800)
+            cached_seconds = time.perf_counter() - start
+    finally:
+        await session.close()
+        await fake.stop()
+
+    return {
+        "prints": print_count,
+        "messages": len(messages),
+        "seconds": seconds,
+        "cached_seconds": cached_seconds,
+        "peak_memory_mb": peak_bytes / 2**20,
+    }
+
+
+async def bench_store_writes(args, backend, write_behind=False):
+    """Measures adding and then updating args.store_ops subscriptions."""
+    with tempfile.TemporaryDirectory() as tmp_dir, isolated_store(tmp_dir, backend):
+        file_operations.enable_write_behind(write_behind)
+        start = time.perf_counter()
+        for i in range(args.store_ops):
+            file_operations.add_watched_print(i % 1000, str(i), "2024-01-01")
+        for i in range(args.store_ops):
+            file_operations.update_print_change_date(i % 1000, str(i), "2024-02-01")
+        await file_operations.flush_watched_prints()
+        seconds = time.perf_counter() - start
+
+    return {
+        "operations": 2 * args.store_ops,
+        "seconds": seconds,
+        "operations_per_second": 2 * args.store_ops / seconds,
+    }
+
+
+async def bench_subscription_memory(args, subscriptions, prints_per_user):
+    """
+    Compares the memory of the subscription table with the nested dict.
+
+    Also measures the peak memory of walking the print -> subscribers
+    index as a watch cycle does, for the table's view and for the
+    inverted dict built from the nested dict.
+    """
+    fake = FakeSejmApi(args.prints)
+    # Both are built from freshly decoded JSON, as when loading the file;
+    # the decoded dict is dropped once the table holds the subscriptions.
+    encoded = json.dumps(make_subscriptions(fake, subscriptions, prints_per_user))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    table = SubscriptionTable(json.loads(encoded))
+    seconds = time.perf_counter() - start
+    table_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for _, watchers in table.print_subscribers().items():
+        pass
+    _, table_index_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    nested = json.loads(encoded)
+    nested_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    inverted = {}
+    for user_id, prints in nested.items():
+        for print_nr, change_date in prints.items():
+            inverted.setdefault(print_nr, {})[user_id] = change_date
+    _, nested_index_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert table == nested
+    assert dict(table.print_subscribers().items()) == inverted
+    return {
+        "subscriptions": subscriptions,
+        "prints_per_user": prints_per_user,
+        "seconds": seconds,
+        "table_mb": table_bytes / 2**20,
+        "nested_dict_mb": nested_bytes / 2**20,
+        "table_index_peak_mb": table_index_peak / 2**20,
+        "nested_dict_index_peak_mb": nested_index_peak / 2**20,
+    }
+
+
+async def run_benchmarks(args):
+    results = {}
+    for size in args.sizes:
+        for strategy in args.strategies:
+            name = f"watch_cycle[{strategy},{size}]"
+            print(f"Running {name}", flush=True)
+            results[name] = await bench_watch_cycle(args, size, strategy)
+        for prints_per_user in (1, PRINTS_PER_USER):
+            name = f"subscription_memory[{size},{prints_per_user}]"
+            print(f"Running {name}", flush=True)
+            results[name] = await bench_subscription_memory(args, size, prints_per_user)
+    for print_count in args.report_prints:
+        name = f"generate_report[{print_count}]"
+        print(f"Running {name}", flush=True)
+        results[name] = await bench_report(args, print_count)
+    for backend, write_behind in (("json", False), ("json", True), ("sqlite", False)):
+        name = f"store_writes[{backend}{',write_behind' if write_behind else ''}]"
+        print(f"Running {name}", flush=True)
+        results[name] = await bench_store_writes(args, backend, write_behind)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparable_parameters(parameters):
+    return {key: value for key, value in parameters.items() if key != "results_dir"}
+
+
+def previous_results(results_dir, parameters):
+    """Returns the latest earlier run made with the same parameters."""
+    for path in sorted(glob.glob(os.path.join(results_dir, "*.json")), reverse=True):
+        with open(path, "r") as f:
+            previous = json.load(f)
+        if comparable_parameters(previous["parameters"]) == comparable_parameters(
+            parameters
+        ):
+            return path, previous
+    return None, None
+
+
+def print_comparison(results, previous):
+    """Prints each benchmark's time next to the previous run's."""
+    previous_results = previous["results"] if previous else {}
+    print(f"{'benchmark':<40} {'seconds':>10} {'previous':>10} {'change':>8}")
+    for name, result in results.items():
+        seconds = result["seconds"]
+        before = previous_results.get(name, {}).get("seconds")
+        if before:
+            change = f"{(seconds - before) / before:+.0%}"
+            print(f"{name:<40} {seconds:>10.3f} {before:>10.3f} {change:>8}")
+        else:
+            print(f"{name:<40} {seconds:>10.3f} {'-':>10} {'':>8}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="Subscription counts for the watch cycle benchmark.",
+    )
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=["adaptive", "poll", "feed"],
+        choices=["adaptive", "poll", "feed"],
+    )
+    parser.add_argument("--prints", type=int, default=20000, help="Prints in the term.")
+    parser.add_argument(
+        "--report-prints",
+        type=int,
+        nargs="+",
+        default=[1000, 10000],
+        help="Print counts for the report benchmark.",
+    )
+    parser.add_argument("--store-ops", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--changed-fraction",
+        type=float,
+        default=0.01,
+        help="Fraction of prints changed between the cold and warm cycle.",
+    )
+    parser.add_argument(
+        "--api-rate",
+        type=float,
+        default=1e6,
+        help="Client rate limit in requests per second (the bot uses 10).",
+    )
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s")
+
+    previous_path, previous = previous_results(args.results_dir, vars(args))
+    results = asyncio.run(run_benchmarks(args))
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(
+        args.results_dir, f"{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "parameters": vars(args),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+    if previous_path:
+        print(f"Compared with {os.path.basename(previous_path)}")
+    print_comparison(results, previous)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
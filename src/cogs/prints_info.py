@@ -1,35 +1,34 @@
+import asyncio
 import discord
 from discord.ext import commands
 import aiohttp
 import urllib.parse
 import logging
-from src.config import PRINTS_ENDPOINT, PROCESSES_ENDPOINT
+from src.utils.messages import chunk_lines
+from src.utils.process_snapshot import stage_label
+from src.utils.sejm_api import SejmApi
+from src.config import PRINTS_ENDPOINT
 
 
 class PrintsInfo(commands.Cog):
     """Commands for getting information about Sejm prints."""
 
-    def __init__(self, bot):
+    def __init__(self, bot, api: SejmApi):
         self.bot = bot
+        self.api = api
 
-    async def _fetch_process_data(
-        self, session: aiohttp.ClientSession, process_nr: str
-    ):
+    async def _fetch_process_data(self, process_nr: str):
         """Fetch process data for a given process number."""
         try:
-            async with session.get(
-                f"{PROCESSES_ENDPOINT}/{process_nr}"
-            ) as process_response:
-                if process_response.status == 200:
-                    return await process_response.json()
-                elif process_response.status == 404:
-                    logging.info(f"Process {process_nr} not found (HTTP 404).")
-                    return None
-                else:
-                    logging.warning(
-                        f"Error fetching process {process_nr}: HTTP {process_response.status}"
-                    )
-                    return None
+            status, process_data = await self.api.fetch_process(process_nr)
+            if status == 200:
+                return process_data
+            elif status == 404:
+                logging.info(f"Process {process_nr} not found (HTTP 404).")
+                return None
+            else:
+                logging.warning(f"Error fetching process {process_nr}: HTTP {status}")
+                return None
         except aiohttp.ClientError as e:
             logging.warning(f"Network error fetching process {process_nr}: {e}")
             return None
@@ -39,6 +38,48 @@ class PrintsInfo(commands.Cog):
             )
             return None
 
+    async def _fetch_print_and_process(self, nr: str):
+        """
+        Fetches a print together with its legislative process.
+
+        The process is looked up by the print number while the print itself
+        is still being fetched, and by the print's processPrint fallback as
+        soon as that is known. The lookup that is not needed is cancelled.
+
+        Returns:
+            tuple: The HTTP status of the print, the print data and the
+                process data (None if unavailable).
+        """
+        process_task = asyncio.create_task(self._fetch_process_data(nr))
+        fallback_task = None
+        try:
+            status, data = await self.api.fetch_print(nr)
+            if status != 200:
+                return status, data, None
+
+            process_prints = data.get("processPrint") or []
+            if process_prints and str(process_prints[0]) != nr:
+                fallback_process_nr = process_prints[0]
+                fallback_task = asyncio.create_task(
+                    self._fetch_process_data(fallback_process_nr)
+                )
+
+            process_data = await process_task
+            # If process not found, use the one from processPrint
+            if not process_data or (
+                not process_data.get("passed") and not process_data.get("stages")
+            ):
+                if fallback_task is not None:
+                    logging.info(
+                        f"Using fallback process for print {nr}: {fallback_process_nr}"
+                    )
+                    process_data = await fallback_task
+            return status, data, process_data
+        finally:
+            for task in (process_task, fallback_task):
+                if task is not None and not task.done():
+                    task.cancel()
+
     @commands.command(name="druk")
     async def print_info(self, ctx, nr: str):
         """Displays information about a Sejm print with the given number."""
@@ -53,18 +94,13 @@ class PrintsInfo(commands.Cog):
                 return
             # Fetch print data
             logging.info(f"Fetching print data for nr: {nr}")
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{PRINTS_ENDPOINT}/{nr}") as response:
-                    if response.status != 200:
-                        if response.status == 404:
-                            await ctx.send(f"Nie znaleziono druku o numerze {nr}")
-                        else:
-                            await ctx.send(
-                                f"Błąd przy pobieraniu danych: HTTP {response.status}"
-                            )
-                        return
-
-                    data = await response.json()
+            status, data, process_data = await self._fetch_print_and_process(nr)
+            if status != 200:
+                if status == 404:
+                    await ctx.send(f"Nie znaleziono druku o numerze {nr}")
+                else:
+                    await ctx.send(f"Błąd przy pobieraniu danych: HTTP {status}")
+                return
 
             # Prepare data
             title = data.get("title", "Brak tytułu")
@@ -86,33 +122,9 @@ class PrintsInfo(commands.Cog):
 
             # Prepare process information
             process_info = "**Proces:** Brak informacji\n"
-            process_data = None
-
-            async with aiohttp.ClientSession() as session:
-                process_data = await self._fetch_process_data(session, nr)
-
-                # If process not found, check if processPrint exists
-                if not process_data or (
-                    not process_data.get("passed") and not process_data.get("stages")
-                ):
-                    if "processPrint" in data and data["processPrint"]:
-                        fallback_process_nr = data["processPrint"][0]
-                        logging.info(
-                            f"Attempting fallback process fetch for print {nr} using {fallback_process_nr}"
-                        )
-                        process_data = await self._fetch_process_data(
-                            session, fallback_process_nr
-                        )
 
             if process_data:
-                stages = process_data.get("stages", [])
-                if process_data.get("passed", False):
-                    info = f"Uchwalono {process_data.get('closureDate', 'Brak daty')}"
-                elif stages:
-                    info = stages[-1].get("stageName", "Brak informacji o etapie")
-                else:
-                    info = "Brak informacji o etapie"
-                process_info = f"**Etap procesu:** {info}\n"
+                process_info = f"**Etap procesu:** {stage_label(process_data)}\n"
 
             # Prepare message
             message = (
@@ -124,7 +136,8 @@ class PrintsInfo(commands.Cog):
                 f"{attachments_info}"
             )
 
-            await ctx.send(message)
+            for part in chunk_lines(message.rstrip("\n").split("\n")):
+                await ctx.send(part)
         except Exception as e:
             logging.error(f"Error in !druk command for print {nr}: {e}", exc_info=True)
             await ctx.send(f"Wystąpił błąd: {str(e)}")
@@ -135,6 +148,7 @@ class PrintsInfo(commands.Cog):
         commands_list = (
             "**Dostępne komendy:**\n"
             "**!druk [numer]** - Wyświetla informacje o druku o podanym numerze\n"
+            "**!szukaj [słowa]** - Wyszukuje druki po słowach z tytułu\n"
             "**!obserwuj [numer]** - Dodaje druk do obserwowanych\n"
             "**!anuluj [numer]** - Usuwa druk z obserwowanych\n"
             "**!moje_druki** - Wyświetla listę obserwowanych druków\n"
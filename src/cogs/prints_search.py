@@ -0,0 +1,80 @@
+import discord
+from discord.ext import commands, tasks
+import contextlib
+import logging
+import textwrap
+from src.utils.messages import chunk_lines
+from src.utils.sejm_api import SejmApi
+from src.config import SEARCH_INDEX_REFRESH_MINUTES, SEARCH_RESULTS_LIMIT
+
+
+class PrintsSearch(commands.Cog):
+    """Commands for searching Sejm prints by title."""
+
+    def __init__(self, bot, api: SejmApi):
+        self.bot = bot
+        self.api = api
+        self.refresh_index_task.start()
+
+    @tasks.loop(minutes=SEARCH_INDEX_REFRESH_MINUTES)
+    async def refresh_index_task(self):
+        """Task to add newly delivered prints to the search index."""
+        index = self.api.search_index
+        mirror = self.api.mirror
+        if mirror is not None:
+            if not mirror.is_ready:
+                return
+            if not len(index):
+                index.add_prints(mirror.all_prints())
+                logging.info(f"Search index loaded {len(index)} prints from mirror")
+            else:
+                # Syncs in this process index pages as they are fetched, but
+                # the mirror may also be synced by the worker process.
+                index.add_prints(mirror.recent_prints(index.newest_delivery_date))
+            return
+
+        # Newest prints come first; stop once past the newest already indexed.
+        newest_delivery_date = index.newest_delivery_date
+        try:
+            async with contextlib.aclosing(
+                self.api.iter_prints("-deliveryDate")
+            ) as all_prints:
+                async for print_item in all_prints:
+                    if print_item.get("deliveryDate", "") < newest_delivery_date:
+                        break
+        except Exception as e:
+            logging.error(f"Error refreshing search index: {e}", exc_info=True)
+        logging.info(f"Search index contains {len(index)} prints")
+
+    @commands.command(name="szukaj")
+    async def search_prints(self, ctx, *, query: str):
+        """Searches prints by words in their titles."""
+        index = self.api.search_index
+        if not len(index):
+            await ctx.send(
+                "Indeks wyszukiwania jest jeszcze budowany. Spróbuj ponownie za chwilę."
+            )
+            return
+
+        results = index.search(query, limit=SEARCH_RESULTS_LIMIT)
+        # The query is echoed back, so it must not break the formatting or
+        # ping anyone (escape_mentions covers @everyone/@here, not users).
+        query = discord.utils.escape_mentions(discord.utils.escape_markdown(query))
+        no_mentions = discord.AllowedMentions.none()
+        if not results:
+            for part in chunk_lines([f"Nie znaleziono druków pasujących do: {query}"]):
+                await ctx.send(part, allowed_mentions=no_mentions)
+            return
+
+        lines = [f"**Wyniki wyszukiwania dla:** {query}"]
+        for print_nr in results:
+            title, delivery_date = index.get(print_nr)
+            shortened_title = textwrap.shorten(
+                discord.utils.escape_markdown(title), width=150, placeholder="..."
+            )
+            lines.append(f"- Druk nr {print_nr} ({delivery_date}): {shortened_title}")
+        for part in chunk_lines(lines):
+            await ctx.send(part, allowed_mentions=no_mentions)
+
+    def cog_unload(self):
+        self.refresh_index_task.cancel()
@@ -1,19 +1,20 @@
 import discord
 from discord.ext import commands
-import aiohttp
 from src.utils.file_operations import (
     add_watched_print,
     remove_watched_print,
     get_user_watched_prints,
 )
-from src.config import PRINTS_ENDPOINT
+from src.utils.messages import chunk_lines
+from src.utils.sejm_api import SejmApi
 
 
 class PrintsWatch(commands.Cog):
     """Commands for watching Sejm prints for changes."""
 
-    def __init__(self, bot):
+    def __init__(self, bot, api: SejmApi):
         self.bot = bot
+        self.api = api
 
     @commands.command(name="obserwuj")
     async def watch_print(self, ctx, nr: str):
@@ -29,18 +30,13 @@ class PrintsWatch(commands.Cog):
             return
         try:
             # Check if the print exists
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{PRINTS_ENDPOINT}/{nr}") as response:
-                    if response.status != 200:
-                        if response.status == 404:
-                            await ctx.send(f"Nie znaleziono druku o numerze {nr}")
-                        else:
-                            await ctx.send(
-                                f"Błąd przy pobieraniu danych: HTTP {response.status}"
-                            )
-                        return
-
-                    data = await response.json()
+            status, data = await self.api.fetch_print(nr)
+            if status != 200:
+                if status == 404:
+                    await ctx.send(f"Nie znaleziono druku o numerze {nr}")
+                else:
+                    await ctx.send(f"Błąd przy pobieraniu danych: HTTP {status}")
+                return
 
             # Add to watched
             change_date = data.get("changeDate", "")
@@ -70,9 +66,8 @@ class PrintsWatch(commands.Cog):
 
         watched = get_user_watched_prints(user_id)
         if watched:
-            message = "**Twoje obserwowane druki:**\n"
-            for nr in watched:
-                message += f"- Druk nr {nr}\n"
-            await ctx.send(message)
+            lines = (f"- Druk nr {nr}" for nr in watched)
+            for part in chunk_lines(lines, header="**Twoje obserwowane druki:**\n"):
+                await ctx.send(part)
         else:
             await ctx.send("Nie obserwujesz żadnych druków.")
@@ -1,21 +1,56 @@
 import discord
 from discord.ext import commands
 import aiohttp
+import contextlib
 import datetime
 import logging
 import urllib.parse
 import discord.utils
 import textwrap
-from src.config import PRINTS_ENDPOINT, DISCORD_MAX_MESSAGE_LENGTH
+from src.utils.cache import AsyncTTLCache
+from src.utils.file_operations import (
+    get_report_channels,
+    add_report_channel,
+    remove_report_channel,
+    set_report_channels,
+)
+from src.utils.messages import chunk_lines
+from src.utils.metrics import track_cache
+from src.utils.outbox import Outbox
+from src.utils.sejm_api import SejmApi, SejmApiError
+from src.config import (
+    PRINTS_ENDPOINT,
+    REPORT_CACHE_SIZE,
+    REPORT_CACHE_TTL_SECONDS,
+    REPORT_RENDERED_TTL_SECONDS,
+)
 
 
 class Reports(commands.Cog):
     """Commands for generating reports."""
 
-    def __init__(self, bot):
+    def __init__(self, bot, api: SejmApi, outbox: Outbox):
         self.bot = bot
+        self.api = api
+        self.outbox = outbox
 
-        self.report_channels = set()
+        # Both are persisted with the watch store, so the weekly report
+        # reaches them right after a restart without scanning any guild.
+        # Format: {channel_id: guild_id}
+        self.report_channels = get_report_channels("registered")
+        # Index of channels named like report channels, kept up to date by
+        # the guild and channel listeners below.
+        # Format: {channel_id: guild_id}
+        self.discovered_channels = get_report_channels("discovered")
+        # Format: {(days, cutoff_date, data_version): report_messages}
+        self._fresh_reports = AsyncTTLCache(REPORT_CACHE_SIZE, REPORT_CACHE_TTL_SECONDS)
+        # Format: {(days, cutoff_date): (data_version, report_messages)}
+        self._rendered_reports = AsyncTTLCache(
+            REPORT_CACHE_SIZE, REPORT_RENDERED_TTL_SECONDS
+        )
+        # Last data version seen, reused when it cannot be checked.
+        self._data_version = None
+        track_cache("reports", self._fresh_reports)
 
     @commands.command(name="raport")
     async def generate_report(self, ctx, days: int = 7):
@@ -38,7 +73,8 @@ class Reports(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def set_channel(self, ctx):
         """Sets the current channel as the channel for weekly reports."""
-        self.report_channels.add(ctx.channel.id)
+        self.report_channels[ctx.channel.id] = ctx.guild.id
+        add_report_channel(ctx.channel.id, ctx.guild.id, "registered")
         await ctx.send(
             f"Kanał {ctx.channel.mention} został ustawiony jako kanał do raportów tygodniowych. "
             f"Raporty będą wysyłane w każdy poniedziałek"
@@ -57,47 +93,102 @@ class Reports(commands.Cog):
             await ctx.send("Nie masz uprawnień administratora do użycia tej komendy.")
 
     async def _generate_report(self, days):
-        """Generate report for the last X days."""
-        logging.info(f"Generating report for the last {days} days")
+        """
+        Generate report for the last X days.
+
+        Reports are cached per (days, cutoff date, data version), so a
+        report is reused until new or changed prints appear, and concurrent
+        requests share one generation.
+        """
         if not isinstance(days, int) or days <= 0:
             raise ValueError("Liczba dni musi być dodatnią liczbą całkowitą.")
-        logging.info(f"Fetching prints from {PRINTS_ENDPOINT} for the last {days} days")
-        # Fetch all prints from the API
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(
-                    f"{PRINTS_ENDPOINT}?sort_by=-deliveryDate"
-                ) as all_prints_response:
-                    all_prints_response.raise_for_status()
-                    all_prints = await all_prints_response.json()
-            except aiohttp.ClientError as e:
-                logging.error(f"Error fetching prints list: {e}", exc_info=True)
-                raise Exception(f"Error fetching prints list: {e}")
-
-            cutoff_date = (
-                datetime.datetime.now() - datetime.timedelta(days=days)
-            ).strftime("%Y-%m-%d")
-
-            recent_prints = []
-            for print_item in all_prints:
-                delivery_date = print_item.get("deliveryDate", "")
-                if delivery_date < cutoff_date:
+        key = await self._report_cache_key(days)
+        days, cutoff_date, _ = key
+
+        return await self._fresh_reports.get_or_fetch(
+            key, lambda: self._build_report(days, cutoff_date)
+        )
+
+    async def prerender_report(self, days):
+        """Renders a report ahead of time so that sending it needs no fetch."""
+        self._fresh_reports.invalidate(await self._report_cache_key(days))
+        return await self._generate_report(days)
+
+    async def _report_cache_key(self, days):
+        """Returns the cache key (days, cutoff_date, data_version) for a report."""
+        return (*self._report_key(days), await self._check_data_version())
+
+    async def _check_data_version(self):
+        """
+        Returns a value that changes whenever prints are added or changed.
+
+        With a ready mirror this is the newest change date it has synced,
+        read from the local database. Otherwise the newest change date is
+        fetched as a one-print page of the print list.
+        """
+        mirror = self.api.mirror
+        if mirror is not None and mirror.is_ready:
+            return mirror.synced_through
+        try:
+            async with contextlib.aclosing(
+                self.api.iter_prints("-changeDate", page_size=1)
+            ) as changed_prints:
+                async for print_item in changed_prints:
+                    self._data_version = print_item.get("changeDate", "")
                     break
+        except Exception as e:
+            logging.error(f"Error checking the print data version: {e}", exc_info=True)
+        return self._data_version
+
+    @staticmethod
+    def _report_key(days):
+        """Returns the cache key (days, cutoff_date) for a report window."""
+        cutoff_date = (
+            datetime.datetime.now() - datetime.timedelta(days=days)
+        ).strftime("%Y-%m-%d")
+        return days, cutoff_date
+
+    async def _build_report(self, days, cutoff_date):
+        """
+        Fetches the prints for a report and renders it.
+
+        Rendering is skipped when the fetched prints have the same data
+        version as the last rendered report for this window.
+        """
+        logging.info(f"Generating report for the last {days} days")
+        print_items = await self._fetch_recent_prints(cutoff_date)
+        version = (
+            len(print_items),
+            max((item.get("deliveryDate", "") for item in print_items), default=""),
+            max((item.get("changeDate", "") for item in print_items), default=""),
+        )
 
-                recent_prints.append(
-                    {
-                        "number": print_item.get("number"),
-                        "title": print_item.get("title", "Brak tytułu"),
-                        "deliveryDate": delivery_date,
-                        "attachments": print_item.get("attachments", []),
-                        "processPrint": print_item.get("processPrint", []),
-                    }
-                )
+        key = (days, cutoff_date)
+        rendered = self._rendered_reports.get(key)
+        if rendered is not None and rendered[0] == version:
+            logging.info(f"Reusing rendered report for the last {days} days")
+            return rendered[1]
 
-            recent_prints.sort(key=lambda x: x["deliveryDate"], reverse=True)
+        report_messages = self._render_report(days, print_items)
+        self._rendered_reports.set(key, (version, report_messages))
+        return report_messages
+
+    def _render_report(self, days, print_items):
+        """Renders report messages from the fetched prints."""
+        recent_prints = [
+            {
+                "number": print_item.get("number"),
+                "title": print_item.get("title", "Brak tytułu"),
+                "deliveryDate": print_item.get("deliveryDate", ""),
+                "attachments": print_item.get("attachments", []),
+                "processPrint": print_item.get("processPrint", []),
+            }
+            for print_item in print_items
+        ]
+
+        recent_prints.sort(key=lambda x: x["deliveryDate"], reverse=True)
 
         if recent_prints:
-            report = f"**Raport druków sejmowych z ostatnich {days} dni:**\n\n"
             logging.info(f"Found {len(recent_prints)} prints in the last {days} days")
             prints_by_date = {}
             for print_item in recent_prints:
@@ -137,24 +228,8 @@ class Reports(commands.Cog):
                     report_lines.append(f"- {report_line_content}{process_info_suffix}")
                 report_lines.append("")
 
-            report_parts = []
-            current_message_lines = []
             initial_header = f"**Raport druków sejmowych z ostatnich {days} dni:**\n\n"
-            current_message_lines.append(initial_header)
-
-            for line in report_lines:
-                temp_content_length = (
-                    sum(len(l) for l in current_message_lines) + len(line) + 1
-                )
-
-                if temp_content_length > DISCORD_MAX_MESSAGE_LENGTH:
-                    report_parts.append("".join(current_message_lines))
-                    current_message_lines = [line + "\n"]
-                else:
-                    current_message_lines.append(line + "\n")
-
-            if current_message_lines:
-                report_parts.append("".join(current_message_lines))
+            report_parts = list(chunk_lines(report_lines, header=initial_header))
 
             final_report_messages = []
             total_parts = len(report_parts)
@@ -167,9 +242,122 @@ class Reports(commands.Cog):
         else:
             return []
 
+    async def _fetch_recent_prints(self, cutoff_date):
+        """
+        Fetches prints delivered on or after the cutoff date.
+
+        Reads the local print mirror when it is available, otherwise fetches
+        the print list page by page, newest first, until the cutoff date.
+        """
+        mirror = self.api.mirror
+        if mirror is not None and mirror.is_ready:
+            logging.info(f"Reading prints since {cutoff_date} from the print mirror")
+            return mirror.recent_prints(cutoff_date)
+
+        logging.info(f"Fetching prints from {PRINTS_ENDPOINT} since {cutoff_date}")
+        recent_prints = []
+        try:
+            async with contextlib.aclosing(
+                self.api.iter_prints("-deliveryDate")
+            ) as all_prints:
+                async for print_item in all_prints:
+                    if print_item.get("deliveryDate", "") < cutoff_date:
+                        break
+                    recent_prints.append(print_item)
+        except (aiohttp.ClientError, SejmApiError) as e:
+            logging.error(f"Error fetching prints list: {e}", exc_info=True)
+            raise Exception(f"Error fetching prints list: {e}")
+        return recent_prints
+
+    @staticmethod
+    def _is_report_channel(channel):
+        """Checks whether a channel is named like a Sejm prints channel."""
+        if not isinstance(channel, discord.TextChannel):
+            return False
+        name = channel.name.lower()
+        return "druki" in name and "sejm" in name
+
+    def _discover_channel(self, channel):
+        if channel.id not in self.discovered_channels:
+            self.discovered_channels[channel.id] = channel.guild.id
+            add_report_channel(channel.id, channel.guild.id, "discovered")
+
+    def _forget_channel(self, channel_id):
+        if channel_id in self.discovered_channels or channel_id in self.report_channels:
+            self.discovered_channels.pop(channel_id, None)
+            self.report_channels.pop(channel_id, None)
+            remove_report_channel(channel_id)
+
+    def _rebuild_channel_index(self):
+        """
+        Rescans this process's guilds, catching up on changes made while
+        offline. Entries of guilds run by other shard processes are kept.
+        """
+        stored_channels = get_report_channels("discovered")
+        # Guilds this process answers for: the ones it runs now, plus stored
+        # ones of its shards that it may have left while offline.
+        own_guild_ids = {
+            guild_id for guild_id in stored_channels.values() if self.bot.owns(guild_id)
+        }
+        own_channels = {}
+        for guild in self.bot.guilds:
+            own_guild_ids.add(guild.id)
+            for channel in guild.text_channels:
+                if self._is_report_channel(channel):
+                    own_channels[channel.id] = guild.id
+        discovered_channels = {
+            channel_id: guild_id
+            for channel_id, guild_id in stored_channels.items()
+            if guild_id not in own_guild_ids
+        }
+        discovered_channels.update(own_channels)
+        if discovered_channels != stored_channels:
+            # Only this process's guilds are rewritten, so concurrently
+            # starting shard processes do not drop each other's channels.
+            set_report_channels(own_channels, "discovered", own_guild_ids)
+        self.discovered_channels = discovered_channels
+
+    async def cog_load(self):
+        # Cogs are added from on_ready, so the listener below misses the
+        # first ready event.
+        if self.bot.is_ready():
+            self._rebuild_channel_index()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self._rebuild_channel_index()
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        for channel in guild.text_channels:
+            if self._is_report_channel(channel):
+                self._discover_channel(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        for channel in guild.text_channels:
+            self._forget_channel(channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        if self._is_report_channel(channel):
+            self._discover_channel(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self._forget_channel(channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if self._is_report_channel(after):
+            self._discover_channel(after)
+        elif after.id in self.discovered_channels:
+            del self.discovered_channels[after.id]
+            remove_report_channel(after.id, "discovered")
+
     async def send_weekly_report(self):
         """
-        Send weekly report to all registered channels.
+        Queue the weekly report for all registered and discovered channels.
         """
         try:
             report_messages = await self._generate_report(7)
@@ -177,33 +365,19 @@ class Reports(commands.Cog):
             if not report_messages:
                 return
 
-            for channel_id in self.report_channels:
-                try:
-                    channel = self.bot.get_channel(channel_id)
-                    if channel:
-                        for message in report_messages:
-                            await channel.send(message)
-                except Exception as e:
-                    logging.error(
-                        f"Error sending report to channel {channel_id}: {e}",
-                        exc_info=True,
-                    )
+            # Read from the store, which also holds the channels of other
+            # shard processes; each process delivers to its own guilds.
+            channels = get_report_channels("discovered")
+            channels.update(get_report_channels("registered"))
 
-            for guild in self.bot.guilds:
-                for channel in guild.text_channels:
-                    if (
-                        "druki" in channel.name.lower()
-                        and "sejm" in channel.name.lower()
-                    ):
-                        if channel.id not in self.report_channels:
-                            for message in report_messages:
-                                try:
-                                    await channel.send(message)
-                                except Exception as e:
-                                    logging.error(
-                                        f"Error sending report to channel {channel.id} (name: {channel.name}): {e}",
-                                        exc_info=True,
-                                    )
+            # The outbox fans the sends out over its worker pool, delivering
+            # the parts to each channel in order and retrying failed sends.
+            self.outbox.put_many(
+                ("channel", channel_id, message, guild_id)
+                for channel_id, guild_id in channels.items()
+                for message in report_messages
+            )
+            logging.info(f"Queued weekly report for {len(channels)} channels")
         except Exception as e:
             logging.error(
                 f"Error generating weekly report: {e}",
@@ -1,5 +1,17 @@
 # File paths
 WATCHED_PRINTS_FILE = "data/watched_prints.json"
+WATCH_STORE_DB_FILE = "data/watched_prints.sqlite3"
+WATCHER_STATE_FILE = "data/watcher_state.json"
+REPORT_CHANNELS_FILE = "data/report_channels.json"
+PRINT_MIRROR_DB_FILE = "data/prints_mirror.sqlite3"
+OUTBOX_DB_FILE = "data/outbox.sqlite3"
+COORDINATOR_DB_FILE = "data/coordinator.sqlite3"
+
+# Storage backend for watched prints: "sqlite" or "json"
+WATCH_STORE_BACKEND = "sqlite"
+# With the JSON backend, batch writes and flush them at most this often
+WATCH_STORE_WRITE_BEHIND = True
+WATCH_STORE_FLUSH_SECONDS = 5
 
 # API endpoints
 API_BASE_URL = "https://api.sejm.gov.pl/sejm/term10"
@@ -8,8 +20,68 @@ PROCESSES_ENDPOINT = f"{API_BASE_URL}/processes"
 
 # Magic numbers
 PRINT_CHECK_INTERVAL_HOURS = 1
+# "adaptive" fetches watched prints on a per-print schedule, "poll" fetches
+# every watched print each cycle, "feed" walks the list of recently changed
+# prints, "mirror" compares against the local print mirror after syncing it
+PRINT_WATCH_STRATEGY = "adaptive"
+# Adaptive schedule: due prints are checked every tick; a changed print is
+# checked again after the minimum interval, unchanged ones back off
+# exponentially up to the maximum (longer for dormant/concluded prints)
+PRINT_SCHEDULE_TICK_MINUTES = 5
+PRINT_POLL_MIN_MINUTES = 30
+PRINT_POLL_MAX_HOURS = 24
+PRINT_POLL_DORMANT_MAX_HOURS = 168
+PRINT_DORMANT_AFTER_DAYS = 90
+PRINT_MIRROR_ENABLED = True  # Keep a local mirror of the term's prints
+PRINT_MIRROR_SYNC_MINUTES = 15
+PRINT_FETCH_CONCURRENCY = 10  # Max requests in flight during a watch cycle
+# Also notify watchers when the legislative process of a print moves to a new
+# stage; each process is fetched at most once per check interval
+PRINT_WATCH_PROCESS_STAGES = True
+PROCESS_CHECK_INTERVAL_HOURS = 6
+# "bot" polls in the Discord process; "worker" leaves polling and mirror syncs
+# to `python -m src.worker` (requires the sqlite watch store)
+PRINT_WATCHER_PROCESS = "bot"
+API_RATE_LIMIT_PER_SECOND = 10  # Max requests started per second per host
+HTTP_POOL_SIZE = 100  # Max open connections in the shared HTTP session
+HTTP_POOL_SIZE_PER_HOST = 20
+HTTP_KEEPALIVE_SECONDS = 60
+HTTP_DNS_CACHE_SECONDS = 300
+HTTP_CONNECT_TIMEOUT_SECONDS = 10
+HTTP_TOTAL_TIMEOUT_SECONDS = 60
+API_CACHE_SIZE = 2048  # Max print/process responses kept in memory
+API_CACHE_TTL_SECONDS = 300
+API_CACHE_NOT_FOUND_TTL_SECONDS = 60
+PRINTS_PAGE_SIZE = 100  # Prints requested per page when walking the print list
+OUTBOX_SENDS_PER_SECOND = 5  # Discord requests per second when sending queued messages
+OUTBOX_WORKERS = 8  # Max messages sent concurrently
+OUTBOX_TARGET_SENDS_PER_SECOND = 1  # Sends per second to a single user or channel
+OUTBOX_TARGET_BURST = 5
+OUTBOX_MAX_ATTEMPTS = 10  # Attempts before a message is given up on
+OUTBOX_BACKOFF_BASE_SECONDS = 5
+OUTBOX_BACKOFF_MAX_SECONDS = 3600
+OUTBOX_POLL_SECONDS = 5
+# Sharding: processes started with SHARD_IDS elect one leader that polls the
+# Sejm API and sends weekly reports; each process delivers to its own shards
+LEADER_LEASE_SECONDS = 60
 WEEKLY_REPORT_DAY = 0
 WEEKLY_REPORT_HOUR = 9
+WEEKLY_REPORT_PRERENDER_MINUTES = (
+    10  # Render the weekly report this long before sending
+)
+REPORT_CACHE_SIZE = 32  # Max cached report windows
+REPORT_CACHE_TTL_SECONDS = 900  # Keep a report for its data version this long
+REPORT_RENDERED_TTL_SECONDS = (
+    86400  # Keep rendered parts for reuse while data is unchanged
+)
+SEARCH_INDEX_REFRESH_MINUTES = 30
+SEARCH_RESULTS_LIMIT = 10
+# Prometheus metrics served at http://METRICS_HOST:port/metrics; shard
+# processes can override the bot's port with the METRICS_PORT variable
+METRICS_ENABLED = True
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+METRICS_WORKER_PORT = 9109
 DISCORD_MAX_MESSAGE_LENGTH = 1975  # "\n*Część 999/999*" is 17 characters. So rounding up to 25 to be absolutely safe we have 2000 - 25 = 1975
 # Ensure data directory exists
 import os
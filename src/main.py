@@ -3,13 +3,36 @@ from discord.ext import commands
 import os
 from dotenv import load_dotenv
 import logging
+import time
 
 from src.cogs.prints_info import PrintsInfo
 from src.cogs.prints_watch import PrintsWatch
 from src.cogs.reports import Reports
 from src.cogs.print_watcher import PrintWatcher
+from src.cogs.prints_search import PrintsSearch
 
 from src.tasks.weekly_report import start_weekly_report
+from src.tasks.store_flush import start_store_flush
+from src.tasks.print_mirror_sync import start_print_mirror_sync
+from src.utils.http_client import create_http_session
+from src.utils.sejm_api import SejmApi
+from src.utils.print_mirror import PrintMirror
+from src.utils.outbox import Outbox, OutboxSender
+from src.utils.sharding import LocalCoordinator, shard_for
+from src.utils.metrics import COMMAND_LATENCY, start_metrics_server, track_outbox
+from src.utils.file_operations import init_store, close_store, flush_watched_prints
+from src.config import (
+    WATCH_STORE_BACKEND,
+    WATCH_STORE_WRITE_BEHIND,
+    PRINT_MIRROR_ENABLED,
+    PRINT_WATCHER_PROCESS,
+    PRINT_MIRROR_DB_FILE,
+    OUTBOX_DB_FILE,
+    COORDINATOR_DB_FILE,
+    METRICS_ENABLED,
+    METRICS_HOST,
+    METRICS_PORT,
+)
 
 load_dotenv()
 
@@ -18,17 +41,117 @@ logging.basicConfig(
 )
 
 
+class SejmBot(commands.AutoShardedBot):
+    """
+    Bot that owns the HTTP session, the watch store and the print mirror shared by all cogs.
+
+    Started with shard_ids, the process runs only those shards and other
+    processes run the rest. The processes elect a leader through the
+    coordinator; only the leader polls the Sejm API and queues
+    notifications and weekly reports, which each process then delivers to
+    the guilds and users of its own shards.
+    """
+
+    http_session = None
+    print_mirror = None
+    outbox = None
+    outbox_sender = None
+    coordinator = None
+    metrics_runner = None
+    store_flush_task = None
+    api = None
+    print_mirror_sync_task = None
+    weekly_report_task = None
+
+    def owns(self, snowflake):
+        """Checks whether a guild (or user) id belongs to this process's shards."""
+        if self.shard_ids is None or snowflake is None:
+            return True
+        return shard_for(snowflake, self.shard_count) in self.shard_ids
+
+    def is_leader(self):
+        """Checks whether this process does the work shared by all shards."""
+        return self.coordinator is None or self.coordinator.is_leader
+
+    async def close(self):
+        """Closes the shared resources after shutting down the bot."""
+        if self.outbox_sender is not None:
+            await self.outbox_sender.stop()
+            self.outbox_sender = None
+        if self.coordinator is not None:
+            await self.coordinator.stop()
+            self.coordinator.close()
+            self.coordinator = None
+        await super().close()
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
+            self.metrics_runner = None
+        if self.http_session is not None:
+            await self.http_session.close()
+            self.http_session = None
+        await flush_watched_prints()
+        close_store()
+        if self.print_mirror is not None:
+            self.print_mirror.close()
+            self.print_mirror = None
+        if self.outbox is not None:
+            self.outbox.close()
+            self.outbox = None
+
+
 async def setup(bot):
     """
     Sets up and adds the bot's cogs.
 
+    Called from on_ready, which discord.py fires again after a failed
+    RESUME, so every resource and task is created only once.
+
     Args:
-        bot (commands.Bot): The bot instance.
+        bot (SejmBot): The bot instance.
     """
-    await bot.add_cog(PrintsInfo(bot))
-    await bot.add_cog(PrintsWatch(bot))
-    await bot.add_cog(Reports(bot))
-    await bot.add_cog(PrintWatcher(bot))
+    if bot.shard_ids is not None and bot.coordinator is None:
+        bot.coordinator = LocalCoordinator(COORDINATOR_DB_FILE)
+        bot.coordinator.start()
+    if METRICS_ENABLED and bot.metrics_runner is None:
+        port = int(os.getenv("METRICS_PORT", METRICS_PORT))
+        bot.metrics_runner = await start_metrics_server(METRICS_HOST, port)
+    if (
+        WATCH_STORE_BACKEND == "json"
+        and WATCH_STORE_WRITE_BEHIND
+        and bot.store_flush_task is None
+    ):
+        bot.store_flush_task = start_store_flush()
+    if bot.http_session is None:
+        bot.http_session = create_http_session()
+    if PRINT_MIRROR_ENABLED and bot.print_mirror is None:
+        bot.print_mirror = PrintMirror(PRINT_MIRROR_DB_FILE)
+    if bot.api is None:
+        init_store()
+        bot.api = SejmApi(bot.http_session, mirror=bot.print_mirror)
+    if (
+        bot.print_mirror is not None
+        and PRINT_WATCHER_PROCESS == "bot"
+        and bot.print_mirror_sync_task is None
+    ):
+        bot.print_mirror_sync_task = start_print_mirror_sync(
+            bot, bot.print_mirror, bot.api
+        )
+
+    if bot.outbox is None:
+        bot.outbox = Outbox(OUTBOX_DB_FILE)
+        track_outbox(bot.outbox)
+        bot.outbox_sender = OutboxSender(
+            bot, bot.outbox, bot.shard_ids, bot.shard_count
+        )
+        bot.outbox_sender.start()
+
+    if bot.get_cog("PrintsInfo") is not None:
+        return
+    await bot.add_cog(PrintsInfo(bot, bot.api))
+    await bot.add_cog(PrintsWatch(bot, bot.api))
+    await bot.add_cog(Reports(bot, bot.api, bot.outbox))
+    await bot.add_cog(PrintWatcher(bot, bot.api, bot.outbox))
+    await bot.add_cog(PrintsSearch(bot, bot.api))
 
 
 def main():
@@ -37,7 +160,16 @@ def main():
     """
     intents = discord.Intents.default()
     intents.message_content = True
-    bot = commands.Bot(command_prefix="!", intents=intents)
+    # For several processes set SHARD_COUNT and, per process, SHARD_IDS
+    # (e.g. "0,1"); without them one process runs all shards.
+    shard_options = {}
+    if os.getenv("SHARD_COUNT"):
+        shard_options["shard_count"] = int(os.getenv("SHARD_COUNT"))
+    if os.getenv("SHARD_IDS"):
+        shard_options["shard_ids"] = [
+            int(shard_id) for shard_id in os.getenv("SHARD_IDS").split(",")
+        ]
+    bot = SejmBot(command_prefix="!", intents=intents, **shard_options)
 
     @bot.event
     async def on_ready():
@@ -48,11 +180,23 @@ def main():
         logging.info(f"Logged in as {bot.user} (ID: {bot.user.id})")
         logging.info("------")
 
-        start_weekly_report(bot)
+        if bot.weekly_report_task is None:
+            bot.weekly_report_task = start_weekly_report(bot)
 
         # Load cogs
         await setup(bot)
 
+    @bot.before_invoke
+    async def start_command_timer(ctx):
+        ctx.started_at = time.perf_counter()
+
+    @bot.after_invoke
+    async def record_command_latency(ctx):
+        """Records how long a command took, whether or not it failed."""
+        COMMAND_LATENCY.observe(
+            time.perf_counter() - ctx.started_at, command=ctx.command.qualified_name
+        )
+
     @bot.event
     async def on_command_error(ctx, error):
         """
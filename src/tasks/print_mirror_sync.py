@@ -0,0 +1,21 @@
+from discord.ext import tasks
+import logging
+from src.config import PRINT_MIRROR_SYNC_MINUTES
+
+
+def start_print_mirror_sync(bot, mirror, api):
+    """Initialize and start the task keeping the print mirror up to date."""
+
+    @tasks.loop(minutes=PRINT_MIRROR_SYNC_MINUTES)
+    async def print_mirror_sync():
+        """Fetch prints changed since the last sync into the mirror."""
+        if not bot.is_leader():
+            return
+        try:
+            await mirror.sync(api)
+        except Exception as e:
+            logging.error(f"Error syncing print mirror: {e}", exc_info=True)
+
+    print_mirror_sync.start()
+
+    return print_mirror_sync
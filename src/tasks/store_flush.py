@@ -0,0 +1,22 @@
+from discord.ext import tasks
+import logging
+from src.config import WATCH_STORE_FLUSH_SECONDS
+from src.utils.file_operations import enable_write_behind, flush_watched_prints
+
+
+def start_store_flush():
+    """Switch the JSON store to write-behind mode and start the flush task."""
+
+    enable_write_behind()
+
+    @tasks.loop(seconds=WATCH_STORE_FLUSH_SECONDS)
+    async def store_flush():
+        """Write pending watched print changes to disk."""
+        try:
+            await flush_watched_prints()
+        except Exception as e:
+            logging.error(f"Error flushing watched prints: {e}", exc_info=True)
+
+    store_flush.start()
+
+    return store_flush
@@ -1,30 +1,60 @@
 from discord.ext import tasks
 import datetime
 import logging
-from src.config import WEEKLY_REPORT_DAY, WEEKLY_REPORT_HOUR
+from src.utils.metrics import WEEKLY_REPORT_DURATION
+from src.config import (
+    WEEKLY_REPORT_DAY,
+    WEEKLY_REPORT_HOUR,
+    WEEKLY_REPORT_PRERENDER_MINUTES,
+)
 
 
 def start_weekly_report(bot):
     """Initialize and start the weekly report task."""
 
     report_time = datetime.time(hour=WEEKLY_REPORT_HOUR)
+    report_datetime = datetime.datetime.combine(datetime.date.today(), report_time)
+    prerender_datetime = report_datetime - datetime.timedelta(
+        minutes=WEEKLY_REPORT_PRERENDER_MINUTES
+    )
+
+    @tasks.loop(time=prerender_datetime.time())
+    async def prerender_weekly_report():
+        """Render the weekly report shortly before it is sent."""
+        if prerender_datetime.date() != report_datetime.date():
+            # The pre-render time falls on the day before the report
+            report_day = (WEEKLY_REPORT_DAY - 1) % 7
+        else:
+            report_day = WEEKLY_REPORT_DAY
+
+        if datetime.datetime.now().weekday() == report_day and bot.is_leader():
+            try:
+                reports_cog = bot.get_cog("Reports")
+                if reports_cog:
+                    with WEEKLY_REPORT_DURATION.time(stage="prerender"):
+                        await reports_cog.prerender_report(7)
+            except Exception as e:
+                logging.error(f"Error pre-rendering weekly report: {e}", exc_info=True)
 
     @tasks.loop(time=report_time)
     async def weekly_report():
         """Generate and send weekly reports on scheduled day and time."""
         now = datetime.datetime.now()
 
-        if now.weekday() == WEEKLY_REPORT_DAY:
+        # Only the leader queues the report; every shard process then
+        # delivers it to the channels of its own guilds.
+        if now.weekday() == WEEKLY_REPORT_DAY and bot.is_leader():
             try:
                 reports_cog = bot.get_cog("Reports")
                 if reports_cog:
-
-                    await reports_cog.send_weekly_report()
+                    with WEEKLY_REPORT_DURATION.time(stage="send"):
+                        await reports_cog.send_weekly_report()
                 else:
                     logging.warning("Reports cog not found. Cannot send weekly report.")
             except Exception as e:
                 logging.error(f"Error generating weekly report: {e}", exc_info=True)
 
+    prerender_weekly_report.start()
     weekly_report.start()
 
     return weekly_report
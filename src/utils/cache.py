@@ -0,0 +1,95 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class AsyncTTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after a time-to-live.
+
+    Concurrent misses for the same key are coalesced: only the first caller
+    runs the fetch, the others await its result.
+
+    Args:
+        maxsize (int): Maximum number of entries kept in memory.
+        ttl (float): Default time-to-live of an entry in seconds.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Returns a fresh cached value, or the default if there is none."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl=None):
+        """Stores a value, evicting the least recently used entry when full."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Removes a key from the cache."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Removes all entries from the cache."""
+        self._entries.clear()
+
+    async def get_or_fetch(self, key, fetch, ttl=None):
+        """
+        Returns the cached value for a key, fetching it on a miss.
+
+        Args:
+            key: The cache key.
+            fetch (callable): Coroutine function producing the value.
+            ttl (float or callable): Time-to-live for the fetched value, or a
+                function mapping the value to its time-to-live. A time-to-live
+                of zero or less means the value is not stored.
+
+        Returns:
+            The cached or freshly fetched value.
+        """
+        entry = self.get(key, _MISSING)
+        if entry is not _MISSING:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(key, fetch, ttl))
+            self._inflight[key] = task
+        # Shielded so a cancelled caller does not cancel the fetch for others.
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, key, fetch, ttl):
+        try:
+            value = await fetch()
+            self.set(key, value, ttl(value) if callable(ttl) else ttl)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+
+_MISSING = object()
@@ -0,0 +1,442 @@
+import asyncio
+import contextlib
+import logging
+import time
+from src.utils.metrics import (
+    WATCH_CYCLE_DURATION,
+    WATCH_PRINTS_CHECKED,
+    WATCH_NOTIFICATIONS_QUEUED,
+)
+from src.utils.file_operations import (
+    get_print_subscribers,
+    update_print_change_date,
+    load_watcher_state,
+    save_watcher_state,
+)
+from src.utils.notifications import NotificationDispatcher
+from src.utils.poll_schedule import PollSchedule
+from src.utils.process_snapshot import snapshot_hash, stage_label
+from src.utils.sejm_api import SejmApi
+from src.config import (
+    PRINT_CHECK_INTERVAL_HOURS,
+    PRINT_FETCH_CONCURRENCY,
+    PRINT_WATCH_STRATEGY,
+    PRINT_SCHEDULE_TICK_MINUTES,
+    PRINT_POLL_MIN_MINUTES,
+    PRINT_POLL_MAX_HOURS,
+    PRINT_POLL_DORMANT_MAX_HOURS,
+    PRINT_DORMANT_AFTER_DAYS,
+    PRINT_WATCH_PROCESS_STAGES,
+    PROCESS_CHECK_INTERVAL_HOURS,
+)
+
+
+class PrintChangeDetector:
+    """
+    Finds watched prints that changed and queues notifications about them.
+
+    Needs no Discord connection: notifications go to the outbox, so a
+    cycle can run in the bot or in the standalone worker (src.worker).
+
+    Args:
+        api (SejmApi): The Sejm API client.
+        outbox (Outbox): The durable queue notifications are written to.
+        strategy (str): "adaptive" fetches the watched prints whose check
+            is due on a per-print schedule, "poll" fetches every watched
+            print, "feed" walks the print list sorted by change date, and
+            "mirror" compares against the print mirror.
+        watch_process_stages (bool): Whether to also notify about prints
+            whose legislative process reached a new stage.
+    """
+
+    def __init__(
+        self,
+        api: SejmApi,
+        outbox,
+        strategy=PRINT_WATCH_STRATEGY,
+        watch_process_stages=PRINT_WATCH_PROCESS_STAGES,
+    ):
+        if strategy not in ("adaptive", "poll", "feed", "mirror"):
+            raise ValueError(f"Unknown print watch strategy: {strategy}")
+        if strategy == "mirror" and api.mirror is None:
+            raise ValueError("The mirror watch strategy requires a print mirror")
+        self.api = api
+        self.strategy = strategy
+        self.watch_process_stages = watch_process_stages
+        self.dispatcher = NotificationDispatcher(outbox)
+        # Loaded from the watcher state on the first adaptive cycle.
+        self.schedule = None
+        # When the schedule was last matched to the subscriptions.
+        self._schedule_synced_at = 0
+        # When process stages were last checked; loaded with the schedule.
+        self._process_checked_at = 0
+
+    @property
+    def interval_seconds(self):
+        """How often run_cycle should be called."""
+        if self.strategy == "adaptive":
+            return PRINT_SCHEDULE_TICK_MINUTES * 60
+        return PRINT_CHECK_INTERVAL_HOURS * 3600
+
+    async def run_cycle(self):
+        """
+        Checks all watched prints once.
+
+        Returns:
+            int: The number of change notifications queued.
+        """
+        if self.strategy == "adaptive" and not self._adaptive_cycle_due(time.time()):
+            # Most ticks find nothing to do; they touch neither the store
+            # nor the state file.
+            return 0
+        logging.info(f"Running watch cycle ({self.strategy})...")
+        with WATCH_CYCLE_DURATION.time(strategy=self.strategy):
+            # Each distinct print is checked once and the result is fanned
+            # out to everyone watching it.
+            subscribers = get_print_subscribers()
+            logging.info(f"Watching {len(subscribers)} distinct prints")
+
+            state = None
+            if self.strategy == "adaptive":
+                checked = await self._poll_scheduled_prints(subscribers)
+            elif self.strategy == "feed":
+                checked, state = await self._check_changed_prints_feed(subscribers)
+            elif self.strategy == "mirror":
+                checked = await self._check_print_mirror(subscribers)
+            else:
+                checked = await self._poll_watched_prints(subscribers)
+            WATCH_PRINTS_CHECKED.inc(checked)
+
+            stage_changes = 0
+            if self.watch_process_stages:
+                state, stage_changes = await self._check_process_stages(
+                    subscribers, state
+                )
+
+            # Changes are queued in the outbox as one digest per user before
+            # the new change dates, feed high-water mark and process
+            # snapshots are stored, so no notification is lost.
+            queued = self.dispatcher.flush()
+            for user_id, print_nr, current_change_date in queued:
+                update_print_change_date(user_id, print_nr, current_change_date)
+            if state is not None:
+                await self._save_state(state)
+        total = len(queued) + stage_changes
+        WATCH_NOTIFICATIONS_QUEUED.inc(total)
+        logging.info(f"Queued {total} change notifications")
+        return total
+
+    async def _poll_watched_prints(self, subscribers):
+        """Fetches every watched print and notifies about changed ones."""
+        semaphore = asyncio.Semaphore(PRINT_FETCH_CONCURRENCY)
+        fetches = [
+            self._fetch_change_date(semaphore, print_nr) for print_nr in subscribers
+        ]
+        # Handle results as they arrive instead of waiting for all fetches.
+        # Watchers are read only then, so a print unwatched in the meantime
+        # has none.
+        for fetch in asyncio.as_completed(fetches):
+            print_nr, _, current_change_date = await fetch
+            self._handle_change_date(
+                print_nr, current_change_date, subscribers.get(print_nr, {})
+            )
+        return len(subscribers)
+
+    async def _poll_scheduled_prints(self, subscribers):
+        """
+        Fetches the watched prints whose check is due.
+
+        Prints that keep changing are checked often and quiet ones less and
+        less, so the API budget goes to the prints likely to change.
+        """
+        schedule = self._load_schedule()
+        now = time.time()
+        synced = schedule.sync(subscribers.keys(), now)
+        self._schedule_synced_at = now
+        due = schedule.pop_due(now)
+        logging.info(f"{len(due)} of {len(subscribers)} watched prints are due")
+        if not due and not synced:
+            return 0
+
+        state = load_watcher_state()
+
+        semaphore = asyncio.Semaphore(PRINT_FETCH_CONCURRENCY)
+        fetches = [self._fetch_change_date(semaphore, print_nr) for print_nr in due]
+        for fetch in asyncio.as_completed(fetches):
+            print_nr, status, current_change_date = await fetch
+            watchers = subscribers.get(print_nr, {})
+            changed = self._handle_change_date(print_nr, current_change_date, watchers)
+            schedule.reschedule(
+                print_nr,
+                now,
+                # A failed check is retried without backing off.
+                changed if status is not None else None,
+                last_change_date=current_change_date
+                or max(watchers.values(), default=None),
+                concluded=self._is_concluded(state, print_nr),
+            )
+
+        state["poll_schedule"] = schedule.to_state()
+        await self._save_state(state)
+        return len(due)
+
+    def _load_schedule(self):
+        """Returns the poll schedule, loading it from the watcher state once."""
+        if self.schedule is None:
+            state = load_watcher_state()
+            self.schedule = PollSchedule(
+                PRINT_POLL_MIN_MINUTES * 60,
+                PRINT_POLL_MAX_HOURS * 3600,
+                PRINT_POLL_DORMANT_MAX_HOURS * 3600,
+                PRINT_DORMANT_AFTER_DAYS * 86400,
+            )
+            self.schedule.load_state(state.get("poll_schedule", {}))
+            self._process_checked_at = state.get("process_checked_at", 0)
+        return self.schedule
+
+    def _adaptive_cycle_due(self, now):
+        """
+        Checks whether an adaptive tick has anything to do.
+
+        That is the case when a print is due, when the schedule has not
+        been matched to new or cancelled subscriptions for
+        PRINT_POLL_MIN_MINUTES, or when process stages are due.
+        """
+        next_check = self._load_schedule().next_check()
+        if next_check is None or next_check <= now:
+            return True
+        if now - self._schedule_synced_at >= PRINT_POLL_MIN_MINUTES * 60:
+            return True
+        return (
+            self.watch_process_stages
+            and now - self._process_checked_at >= PROCESS_CHECK_INTERVAL_HOURS * 3600
+        )
+
+    async def _save_state(self, state):
+        """Saves the watcher state in a thread, off the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, save_watcher_state, state)
+
+    async def _check_changed_prints_feed(self, subscribers):
+        """
+        Walks the print list sorted by change date and notifies about
+        watched prints changed since the previous cycle.
+
+        Only entries not older than the stored high-water mark are
+        examined, so the cost of a cycle follows what changed in the Sejm
+        rather than the number of subscriptions.
+
+        Returns:
+            tuple: The number of prints examined and the watcher state with
+                the new high-water mark, to save once the notifications are
+                queued (None if the walk failed).
+        """
+        state = load_watcher_state()
+        high_water_mark = state.get("feed_high_water_mark", "")
+
+        newest_change_date = high_water_mark
+        examined = 0
+        try:
+            async with contextlib.aclosing(
+                self.api.iter_prints("-changeDate")
+            ) as changed_prints:
+                async for print_item in changed_prints:
+                    current_change_date = print_item.get("changeDate", "")
+                    # Entries equal to the mark are re-examined in case more
+                    # prints changed within the same second after the
+                    # previous cycle.
+                    if current_change_date < high_water_mark:
+                        break
+                    examined += 1
+                    newest_change_date = max(newest_change_date, current_change_date)
+
+                    print_nr = str(print_item.get("number"))
+                    if print_nr in subscribers:
+                        self._handle_change_date(
+                            print_nr, current_change_date, subscribers[print_nr]
+                        )
+        except Exception as e:
+            # The mark is not advanced, so the next cycle walks this range again.
+            logging.error(f"Error walking changed prints feed: {e}", exc_info=True)
+            return examined, None
+
+        logging.info(f"Examined {examined} changed prints since {high_water_mark}")
+        state["feed_high_water_mark"] = newest_change_date
+        return examined, state
+
+    async def _check_print_mirror(self, subscribers):
+        """Syncs the print mirror and compares watched prints against it."""
+        mirror = self.api.mirror
+        try:
+            await mirror.sync(self.api)
+        except Exception as e:
+            # Still compare against what the mirror already has.
+            logging.error(f"Error syncing print mirror: {e}", exc_info=True)
+
+        change_dates = mirror.get_change_dates()
+        for print_nr, watchers in subscribers.items():
+            self._handle_change_date(print_nr, change_dates.get(print_nr), watchers)
+        return len(subscribers)
+
+    async def _check_process_stages(self, subscribers, state=None):
+        """
+        Queues notifications for watched prints whose process reached a new stage.
+
+        Prints belonging to the same process (listed in its processPrint)
+        share one fetch. A process whose snapshot hash matches the stored
+        one is skipped without further work. Runs at most once per
+        PROCESS_CHECK_INTERVAL_HOURS.
+
+        Args:
+            subscribers (dict): {print_nr: {user_id: last_change_date}}.
+            state (dict): Watcher state the strategy has yet to save, if any;
+                the snapshots are added to it.
+
+        Returns:
+            tuple: The watcher state to save once the notifications are
+                queued (None if there is nothing to save) and the number of
+                users notified.
+        """
+        interval = PROCESS_CHECK_INTERVAL_HOURS * 3600
+        now = time.time()
+        if now - self._process_checked_at < interval:
+            return state, 0
+        pending = state
+        if state is None:
+            state = load_watcher_state()
+        # The state file is authoritative, e.g. right after a restart.
+        self._process_checked_at = state.get("process_checked_at", 0)
+        if now - self._process_checked_at < interval:
+            return pending, 0
+
+        semaphore = asyncio.Semaphore(PRINT_FETCH_CONCURRENCY)
+        # Format: {print_nr: process_nr}; a print never moves to another process.
+        print_processes = {
+            print_nr: process_nr
+            for print_nr, process_nr in state.get("print_processes", {}).items()
+            if print_nr in subscribers
+        }
+        unknown = [nr for nr in subscribers if nr not in print_processes]
+        for print_nr, process_nr in await asyncio.gather(
+            *(self._fetch_process_nr(semaphore, nr) for nr in unknown)
+        ):
+            if process_nr is not None:
+                print_processes[print_nr] = process_nr
+
+        # Format: {process_nr: [print_nr, ...]}
+        processes = {}
+        for print_nr, process_nr in print_processes.items():
+            processes.setdefault(process_nr, []).append(print_nr)
+
+        # Format: {process_nr: [hash, stage, passed]}
+        snapshots = {
+            process_nr: snapshot
+            for process_nr, snapshot in state.get("process_snapshots", {}).items()
+            if process_nr in processes
+        }
+        notified = 0
+        fetches = [self._fetch_process(semaphore, nr) for nr in processes]
+        for fetch in asyncio.as_completed(fetches):
+            process_nr, process_data = await fetch
+            if process_data is None:
+                continue
+            digest = snapshot_hash(process_data)
+            previous = snapshots.get(process_nr)
+            if previous is not None and previous[0] == digest:
+                continue
+            stage = stage_label(process_data)
+            snapshots[process_nr] = [digest, stage, process_data.get("passed", False)]
+            # The first snapshot of a process is only a baseline.
+            if previous is None or previous[1] == stage:
+                continue
+            for print_nr in processes[process_nr]:
+                for user_id in subscribers.get(print_nr, ()):
+                    self.dispatcher.queue_stage_change(
+                        user_id, print_nr, previous[1], stage
+                    )
+                    notified += 1
+        logging.info(f"Checked {len(processes)} legislative processes")
+
+        state["print_processes"] = print_processes
+        state["process_snapshots"] = snapshots
+        state["process_checked_at"] = now
+        self._process_checked_at = now
+        return state, notified
+
+    async def _fetch_process_nr(self, semaphore, print_nr):
+        """Returns the print number and the number of its process (None on failure)."""
+        async with semaphore:
+            try:
+                status, print_data = await self.api.fetch_print(print_nr)
+            except Exception as e:
+                logging.error(f"Error fetching print {print_nr}: {e}", exc_info=True)
+                return print_nr, None
+        if status != 200:
+            return print_nr, None
+        process_prints = print_data.get("processPrint") or [print_nr]
+        return print_nr, str(process_prints[0])
+
+    async def _fetch_process(self, semaphore, process_nr):
+        """Returns the process number and its data (None on failure)."""
+        async with semaphore:
+            try:
+                status, process_data = await self.api.fetch_process(process_nr)
+            except Exception as e:
+                logging.error(
+                    f"Error fetching process {process_nr}: {e}", exc_info=True
+                )
+                return process_nr, None
+        return process_nr, process_data if status == 200 else None
+
+    @staticmethod
+    def _is_concluded(state, print_nr):
+        """Whether the last check of the print's process found it passed."""
+        process_nr = state.get("print_processes", {}).get(print_nr)
+        snapshot = state.get("process_snapshots", {}).get(process_nr)
+        return bool(snapshot and snapshot[2])
+
+    def _handle_change_date(self, print_nr, current_change_date, watchers):
+        """
+        Queues a notification for every watcher whose stored change date differs.
+
+        Returns:
+            bool: True if any watcher was notified.
+        """
+        if not current_change_date:
+            return False
+
+        changed = False
+        for user_id, last_change_date in watchers.items():
+            # If the date has changed, notify the user
+            if current_change_date != last_change_date:
+                self.dispatcher.queue(
+                    user_id, print_nr, last_change_date, current_change_date
+                )
+                changed = True
+        return changed
+
+    async def _fetch_change_date(self, semaphore, print_nr):
+        """
+        Fetches the current change date of a print.
+
+        Args:
+            semaphore (asyncio.Semaphore): Limits the number of requests in flight.
+            print_nr (str): The print number.
+
+        Returns:
+            tuple: The print number, the HTTP status (None if the request
+                failed) and the change date, which is None if the print could
+                not be fetched.
+        """
+        async with semaphore:
+            try:
+                status, data = await self.api.fetch_print_if_modified(print_nr)
+            except Exception as e:
+                logging.error(f"Error checking print {print_nr}: {e}", exc_info=True)
+                return print_nr, None, None
+        if status not in (200, 304):
+            return print_nr, None, None
+        # A 304 carries the changeDate stored with the validators, so watchers
+        # whose stored date fell behind (e.g. after a failed cycle) are still
+        # compared against it.
+        return print_nr, status, data.get("changeDate") or ""
@@ -1,20 +1,66 @@
+import asyncio
 import json
 import os
-from src.config import WATCHED_PRINTS_FILE
+from src.config import (
+    WATCHED_PRINTS_FILE,
+    WATCH_STORE_BACKEND,
+    WATCH_STORE_DB_FILE,
+    WATCHER_STATE_FILE,
+    REPORT_CHANNELS_FILE,
+)
+from src.utils.subscriptions import SubscriptionTable
+from src.utils.watch_store import SqliteWatchStore
 
-# Structure for storing watched prints
-# Format: {user_id: {print_number: last_change_date}}
-watched_prints = {}
+# Structure for storing watched prints; reads like
+# {user_id: {print_number: last_change_date}} but stores every print once
+watched_prints = SubscriptionTable()
+
+# Storage backend used instead of the JSON file, set by init_store
+_store = None
+
+# In write-behind mode mutations only mark the JSON store dirty and
+# flush_watched_prints writes it out later
+_write_behind = False
+_dirty = False
+_flush_lock = asyncio.Lock()
+
+
+def init_store(backend=WATCH_STORE_BACKEND):
+    """
+    Selects the storage backend for watched prints.
+
+    Args:
+        backend (str): "json" to keep everything in the JSON file, or
+            "sqlite" to use an SQLite database. The first start with
+            "sqlite" imports the existing JSON file.
+    """
+    global _store
+    close_store()
+    if backend == "sqlite":
+        _store = SqliteWatchStore(WATCH_STORE_DB_FILE)
+        _store.migrate_from_json(WATCHED_PRINTS_FILE)
+    elif backend == "json":
+        load_watched_prints()
+    else:
+        raise ValueError(f"Unknown watch store backend: {backend}")
+
+
+def close_store():
+    """Closes the storage backend, if one is open."""
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
 
 
 def load_watched_prints():
     """Loads watched prints from the file."""
-    global watched_prints
+    if _store is not None:
+        return _store.get_all()
+    watched_prints.clear()
     if os.path.exists(WATCHED_PRINTS_FILE):
         with open(WATCHED_PRINTS_FILE, "r") as f:
-            watched_prints = json.load(f)
-    else:
-        watched_prints = {}
+            watched_prints.update(json.load(f))
     return watched_prints
 
 
@@ -22,12 +68,72 @@ def save_watched_prints():
     """Saves watched prints to the file."""
     os.makedirs(os.path.dirname(WATCHED_PRINTS_FILE), exist_ok=True)
     with open(WATCHED_PRINTS_FILE, "w") as f:
-        json.dump(watched_prints, f)
+        json.dump(watched_prints.to_dict(), f)
+
+
+def enable_write_behind(enabled=True):
+    """
+    Switches the JSON store between immediate and write-behind saving.
+
+    In write-behind mode add/remove/update calls do not touch the disk;
+    flush_watched_prints must be awaited periodically and on shutdown.
+    """
+    global _write_behind
+    _write_behind = enabled
+
+
+def _persist():
+    """Saves watched prints now, or marks them dirty in write-behind mode."""
+    global _dirty
+    if _write_behind:
+        _dirty = True
+    else:
+        save_watched_prints()
+
+
+def _write_atomically(path, data):
+    """Writes JSON to a temporary file and moves it over the target."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+async def flush_watched_prints():
+    """
+    Writes pending changes to the JSON file without blocking the event loop.
+
+    The data is snapshotted on the event loop and written in an executor
+    thread via a temporary file and os.replace, so a crash never leaves a
+    truncated file behind.
+
+    Returns:
+        bool: True if anything was written.
+    """
+    global _dirty
+    async with _flush_lock:
+        if not _dirty:
+            return False
+        _dirty = False
+        snapshot = watched_prints.to_dict()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                None, _write_atomically, WATCHED_PRINTS_FILE, snapshot
+            )
+        except Exception:
+            _dirty = True
+            raise
+        return True
 
 
 def get_watched_prints():
     """Returns the dictionary of watched prints."""
-    global watched_prints
+    if _store is not None:
+        return _store.get_all()
     if not watched_prints:
         load_watched_prints()
     return watched_prints
@@ -35,46 +141,146 @@ def get_watched_prints():
 
 def add_watched_print(user_id, print_nr, change_date):
     """Adds a print to the watched list."""
-    global watched_prints
-    user_id = str(user_id)
-
-    if user_id not in watched_prints:
-        watched_prints[user_id] = {}
-
-    watched_prints[user_id][print_nr] = change_date
-    save_watched_prints()
+    if _store is not None:
+        return _store.add(user_id, print_nr, change_date)
+    watched_prints.set(user_id, print_nr, change_date)
+    _persist()
     return True
 
 
 def remove_watched_print(user_id, print_nr):
     """Removes a print from the watched list."""
-    global watched_prints
-    user_id = str(user_id)
-
-    if user_id in watched_prints and print_nr in watched_prints[user_id]:
-        del watched_prints[user_id][print_nr]
-        save_watched_prints()
+    if _store is not None:
+        return _store.remove(user_id, print_nr)
+    if watched_prints.discard(user_id, print_nr):
+        _persist()
         return True
     return False
 
 
 def update_print_change_date(user_id, print_nr, new_date):
     """Updates the change date for a watched print."""
-    global watched_prints
-    user_id = str(user_id)
-
-    if user_id in watched_prints and print_nr in watched_prints[user_id]:
-        watched_prints[user_id][print_nr] = new_date
-        save_watched_prints()
+    if _store is not None:
+        return _store.update_change_date(user_id, print_nr, new_date)
+    if print_nr in watched_prints.get(str(user_id), {}):
+        watched_prints.set(user_id, print_nr, new_date)
+        _persist()
         return True
     return False
 
 
 def get_user_watched_prints(user_id):
     """Retrieves the list of prints watched by a user."""
-    global watched_prints
-    user_id = str(user_id)
+    if _store is not None:
+        return _store.get_user(user_id)
+    return watched_prints.user_prints(user_id)
+
+
+def get_print_subscribers():
+    """
+    Builds an inverted index of watched prints.
+
+    With the JSON store this is a read-only view of the subscription table
+    that reads a print's subscribers when the print is looked up, so a
+    watch cycle does not hold a second copy of all subscriptions.
+
+    Returns:
+        Mapping: Mapping of print number to a dict of
+            {user_id: last_change_date} for every user watching that print.
+    """
+    if _store is not None:
+        return _store.get_print_subscribers()
+    return get_watched_prints().print_subscribers()
+
+
+def load_watcher_state():
+    """Loads the watcher's bookkeeping state (e.g. the feed high-water mark)."""
+    if os.path.exists(WATCHER_STATE_FILE):
+        with open(WATCHER_STATE_FILE, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def save_watcher_state(state):
+    """Saves the watcher's bookkeeping state atomically."""
+    _write_atomically(WATCHER_STATE_FILE, state)
+
 
-    if user_id in watched_prints:
-        return watched_prints[user_id]
+def _load_report_channels():
+    if os.path.exists(REPORT_CHANNELS_FILE):
+        with open(REPORT_CHANNELS_FILE, "r") as f:
+            return {
+                source: {
+                    int(channel_id): guild_id for channel_id, guild_id in ids.items()
+                }
+                for source, ids in json.load(f).items()
+            }
     return {}
+
+
+def get_report_channels(source="registered"):
+    """
+    Returns the channels weekly reports are sent to.
+
+    Args:
+        source (str): "registered" for channels set with !ustaw_kanał, or
+            "discovered" for the index of channels found by name.
+
+    Returns:
+        dict: Mapping of channel id to the id of its guild.
+    """
+    if _store is not None:
+        return _store.get_report_channels(source)
+    return _load_report_channels().get(source, {})
+
+
+def add_report_channel(channel_id, guild_id, source="registered"):
+    """Adds a report channel. Returns False if it was already stored."""
+    if _store is not None:
+        return _store.add_report_channel(channel_id, guild_id, source)
+    channels = _load_report_channels()
+    ids = channels.setdefault(source, {})
+    if channel_id in ids:
+        return False
+    ids[channel_id] = guild_id
+    _write_atomically(REPORT_CHANNELS_FILE, channels)
+    return True
+
+
+def remove_report_channel(channel_id, source=None):
+    """Removes a report channel from one source, or from all of them."""
+    if _store is not None:
+        return _store.remove_report_channel(channel_id, source)
+    channels = _load_report_channels()
+    removed = False
+    for ids_source, ids in channels.items():
+        if source in (None, ids_source) and channel_id in ids:
+            del ids[channel_id]
+            removed = True
+    if removed:
+        _write_atomically(REPORT_CHANNELS_FILE, channels)
+    return removed
+
+
+def set_report_channels(channels, source="discovered", guild_ids=None):
+    """
+    Replaces the report channels of a source with {channel_id: guild_id}.
+
+    With guild_ids only the channels of those guilds are replaced and the
+    rest of the source is kept.
+    """
+    if _store is not None:
+        return _store.set_report_channels(channels, source, guild_ids)
+    all_channels = _load_report_channels()
+    if guild_ids is None:
+        all_channels[source] = dict(channels)
+    else:
+        guild_ids = set(guild_ids)
+        ids = {
+            channel_id: guild_id
+            for channel_id, guild_id in all_channels.get(source, {}).items()
+            if guild_id not in guild_ids
+        }
+        ids.update(channels)
+        all_channels[source] = ids
+    _write_atomically(REPORT_CHANNELS_FILE, all_channels)
@@ -0,0 +1,32 @@
+import aiohttp
+from src.config import (
+    HTTP_POOL_SIZE,
+    HTTP_POOL_SIZE_PER_HOST,
+    HTTP_KEEPALIVE_SECONDS,
+    HTTP_DNS_CACHE_SECONDS,
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    HTTP_TOTAL_TIMEOUT_SECONDS,
+)
+
+
+def create_http_session():
+    """
+    Creates the HTTP session shared by the whole bot.
+
+    The session keeps a pool of keep-alive connections and caches DNS
+    lookups, so repeated requests to the Sejm API reuse warm connections.
+    Must be called from within a running event loop.
+
+    Returns:
+        aiohttp.ClientSession: The configured session.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE,
+        limit_per_host=HTTP_POOL_SIZE_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+        ttl_dns_cache=HTTP_DNS_CACHE_SECONDS,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=HTTP_TOTAL_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
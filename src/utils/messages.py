@@ -0,0 +1,74 @@
+import re
+from src.config import DISCORD_MAX_MESSAGE_LENGTH
+
+# Markdown spans that must not be split: links, bold text and inline code
+_PROTECTED_SPAN_RE = re.compile(r"\[[^\]\n]*\]\([^)\s]*\)|\*\*[^*\n]+\*\*|`[^`\n]+`")
+
+
+def chunk_lines(lines, limit=DISCORD_MAX_MESSAGE_LENGTH, header=""):
+    """
+    Joins lines into messages no longer than the limit.
+
+    Lines are kept whole whenever they fit. A line longer than the limit
+    is split at whitespace outside markdown links, bold text and inline
+    code, falling back to a hard cut only when there is no such place.
+
+    Args:
+        lines (iterable): Lines of text, without trailing newlines.
+        limit (int): Maximum length of a single message.
+        header (str): Text placed at the start of the first message.
+
+    Yields:
+        str: The next message.
+    """
+    current = [header] if header else []
+    length = len(header)
+    for line in lines:
+        # A line too long for any message is split to fill the space left
+        # after the header rather than leaving the header on its own.
+        if current == [header] and len(line) > limit - 1:
+            first_limit = limit - length - 1
+        else:
+            first_limit = limit - 1
+        for piece in _split_long_line(line, limit - 1, max(first_limit, 1)):
+            if current and length + len(piece) + 1 > limit:
+                yield "".join(current)
+                current = []
+                length = 0
+            current.append(piece + "\n")
+            length += len(piece) + 1
+    if current:
+        yield "".join(current)
+
+
+def _split_long_line(line, limit, first_limit=None):
+    """
+    Splits a line into pieces of at most `limit` characters.
+
+    The first piece is at most `first_limit` characters, if given.
+    """
+    piece_limit = limit if first_limit is None else min(first_limit, limit)
+    while len(line) > piece_limit:
+        cut = _find_break(line, piece_limit)
+        yield line[:cut].rstrip()
+        line = line[cut:].lstrip()
+        piece_limit = limit
+    yield line
+
+
+def _find_break(line, limit):
+    """Finds the best position to split a line before the limit."""
+    protected = [
+        match.span()
+        for match in _PROTECTED_SPAN_RE.finditer(line)
+        if match.start() < limit
+    ]
+    fallback = None
+    for position in range(limit, 0, -1):
+        if not line[position].isspace():
+            continue
+        if not any(start < position < end for start, end in protected):
+            return position
+        if fallback is None:
+            fallback = position
+    return fallback or limit
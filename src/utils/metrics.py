@@ -0,0 +1,317 @@
+import bisect
+import contextlib
+import logging
+import time
+from aiohttp import web
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return f"{{{pairs}}}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """
+    Collection of metrics rendered in the Prometheus text format.
+
+    Besides metrics updated by the code, collectors are called on every
+    scrape to report values that are cheaper to read than to track, such
+    as cache hit counters or the outbox length.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        # Format: {key: collector}
+        self._collectors = {}
+
+    def register(self, metric):
+        """Adds a metric to the registry."""
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector, key=None):
+        """
+        Adds a function called on every scrape.
+
+        The function returns (name, type, help, samples) tuples, where
+        samples is a list of (labels dict, value) pairs. A collector added
+        with the key of an earlier one replaces it, so re-creating a tracked
+        object does not report its series twice.
+        """
+        self._collectors[collector if key is None else key] = collector
+
+    def render(self):
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        # Several collectors may report the same metric, e.g. one per cache,
+        # and each metric may only be described once.
+        # Format: {name: (type, help, samples)}
+        families = {}
+        for collector in self._collectors.values():
+            try:
+                collected = collector()
+            except Exception as e:
+                logging.error(f"Error collecting metrics: {e}", exc_info=True)
+                continue
+            for name, metric_type, documentation, samples in collected:
+                families.setdefault(name, (metric_type, documentation, []))[2].extend(
+                    samples
+                )
+        for name, (metric_type, documentation, samples) in families.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                labels = _format_labels(sorted(labels.items()))
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Format: {label_values: value}
+        self._values = {}
+        registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        return _format_labels([*zip(self.labelnames, key), *extra])
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for key, value in sorted(self._values.items()):
+            lines.extend(self._render_samples(key, value))
+        return lines
+
+    def _render_samples(self, key, value):
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Value that only goes up, e.g. the number of requests."""
+
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. the number of watched prints."""
+
+    metric_type = "gauge"
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values, e.g. request latency in seconds.
+
+    Args:
+        buckets (tuple): Upper bounds of the buckets, in increasing order.
+    """
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        buckets=DEFAULT_BUCKETS,
+        registry=REGISTRY,
+    ):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        counts = self._values.get(key)
+        if counts is None:
+            # Per-bucket counts, the +Inf bucket, then the sum.
+            counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observes how long the enclosed block took, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        counts = self._values.get(self._key(labels))
+        return sum(counts[:-1]) if counts else 0
+
+    def _render_samples(self, key, counts):
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            cumulative += count
+            labels = self._labels(key, [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        lines.append(f"{self.name}_sum{self._labels(key)} {counts[-1]}")
+        lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+SEJM_API_LATENCY = Histogram(
+    "sejmbot_api_request_seconds",
+    "Latency of Sejm API requests.",
+    ["endpoint"],
+)
+SEJM_API_REQUESTS = Counter(
+    "sejmbot_api_requests_total",
+    "Sejm API requests by response status.",
+    ["endpoint", "status"],
+)
+WATCH_CYCLE_DURATION = Histogram(
+    "sejmbot_watch_cycle_seconds",
+    "Duration of a watch cycle.",
+    ["strategy"],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+WATCH_PRINTS_CHECKED = Counter(
+    "sejmbot_watch_prints_checked_total",
+    "Distinct watched prints checked by watch cycles.",
+)
+WATCH_NOTIFICATIONS_QUEUED = Counter(
+    "sejmbot_watch_notifications_queued_total",
+    "Change notifications queued by watch cycles.",
+)
+DISCORD_SEND_LATENCY = Histogram(
+    "sejmbot_discord_send_seconds",
+    "Latency of messages sent from the outbox.",
+    ["target_type"],
+)
+DISCORD_SEND_FAILURES = Counter(
+    "sejmbot_discord_send_failures_total",
+    "Failed outbox sends by reason (rate_limited, undeliverable, error).",
+    ["target_type", "reason"],
+)
+COMMAND_LATENCY = Histogram(
+    "sejmbot_command_seconds",
+    "Latency of bot commands.",
+    ["command"],
+)
+WEEKLY_REPORT_DURATION = Histogram(
+    "sejmbot_weekly_report_seconds",
+    "Duration of pre-rendering and queueing the weekly report.",
+    ["stage"],
+)
+
+
+def track_cache(name, cache, registry=REGISTRY):
+    """Reports the hit and miss counters of an AsyncTTLCache on every scrape."""
+
+    def collect():
+        return [
+            (
+                "sejmbot_cache_requests_total",
+                "counter",
+                "Cache lookups by result.",
+                [
+                    ({"cache": name, "result": "hit"}, cache.hits),
+                    ({"cache": name, "result": "miss"}, cache.misses),
+                ],
+            ),
+            (
+                "sejmbot_cache_entries",
+                "gauge",
+                "Entries held by the cache.",
+                [({"cache": name}, len(cache))],
+            ),
+        ]
+
+    registry.add_collector(collect, key=("cache", name))
+
+
+def track_outbox(outbox, registry=REGISTRY):
+    """Reports the number of messages waiting in the outbox on every scrape."""
+
+    def collect():
+        return [
+            (
+                "sejmbot_outbox_pending",
+                "gauge",
+                "Messages waiting in the outbox.",
+                [({}, outbox.pending_count())],
+            )
+        ]
+
+    registry.add_collector(collect, key="outbox")
+
+
+async def start_metrics_server(host, port, registry=REGISTRY):
+    """
+    Serves the metrics at http://host:port/metrics.
+
+    The metrics are optional, so a port that cannot be bound (e.g. taken
+    by another shard process on the same host) is logged and the bot runs
+    without them.
+
+    Returns:
+        web.AppRunner: The runner; call cleanup() on it to stop the server.
+            None if the server could not be started.
+    """
+
+    async def handle_metrics(request):
+        return web.Response(
+            body=registry.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except OSError as e:
+        logging.error(f"Could not serve metrics on {host}:{port}: {e}")
+        await runner.cleanup()
+        return None
+    logging.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,113 @@
+from src.utils.messages import chunk_lines
+
+
+def format_digest(changes, stage_changes=()):
+    """
+    Formats the change notifications for one user.
+
+    Args:
+        changes (list): (print_nr, last_change_date, current_change_date) tuples.
+        stage_changes (list): (print_nr, previous_stage, current_stage)
+            tuples for prints whose legislative process moved on.
+
+    Returns:
+        list: The message parts to send.
+    """
+    if len(changes) == 1 and not stage_changes:
+        print_nr, last_change_date, current_change_date = changes[0]
+        return [
+            f"**Aktualizacja druku nr {print_nr}**\n"
+            f"**Poprzednia data zmiany:** {last_change_date}\n"
+            f"**Nowa data zmiany:** {current_change_date}\n"
+            f"Użyj `!druk {print_nr}` aby zobaczyć szczegóły."
+        ]
+    if len(stage_changes) == 1 and not changes:
+        print_nr, previous_stage, current_stage = stage_changes[0]
+        return [
+            f"**Nowy etap procesu druku nr {print_nr}**\n"
+            f"**Poprzedni etap:** {previous_stage}\n"
+            f"**Obecny etap:** {current_stage}\n"
+            f"Użyj `!druk {print_nr}` aby zobaczyć szczegóły."
+        ]
+
+    lines = [
+        f"- Druk nr {print_nr}: {last_change_date} → {current_change_date}"
+        for print_nr, last_change_date, current_change_date in changes
+    ]
+    lines.extend(
+        f"- Druk nr {print_nr}, etap procesu: {previous_stage} → {current_stage}"
+        for print_nr, previous_stage, current_stage in stage_changes
+    )
+    lines.append("Użyj `!druk [numer]` aby zobaczyć szczegóły.")
+    header = f"**Aktualizacje obserwowanych druków ({len(lines) - 1}):**\n"
+    return list(chunk_lines(lines, header=header))
+
+
+class NotificationDispatcher:
+    """
+    Collects change notifications and queues one digest per user.
+
+    Notifications are gathered during a watch cycle and written to the
+    outbox together, which delivers them in the background.
+
+    Args:
+        outbox (Outbox): The durable queue of outgoing messages.
+    """
+
+    def __init__(self, outbox):
+        self.outbox = outbox
+        # Format: {user_id: {print_nr: (last_change_date, current_change_date)}}
+        self._pending = {}
+        # Format: {user_id: {print_nr: (previous_stage, current_stage)}}
+        self._pending_stages = {}
+
+    def queue(self, user_id, print_nr, last_change_date, current_change_date):
+        """Queues a change notification, replacing an older one for the same print."""
+        self._pending.setdefault(str(user_id), {})[print_nr] = (
+            last_change_date,
+            current_change_date,
+        )
+
+    def queue_stage_change(self, user_id, print_nr, previous_stage, current_stage):
+        """Queues a notification that the process of a print reached a new stage."""
+        self._pending_stages.setdefault(str(user_id), {})[print_nr] = (
+            previous_stage,
+            current_stage,
+        )
+
+    def flush(self):
+        """
+        Writes the queued notifications to the outbox as one digest per user.
+
+        Returns:
+            list: (user_id, print_nr, current_change_date) tuples of the
+                notifications handed over to the outbox. Their change dates
+                can be stored, as the outbox guarantees delivery.
+        """
+        pending, self._pending = self._pending, {}
+        pending_stages, self._pending_stages = self._pending_stages, {}
+        messages = []
+        settled = []
+        for user_id in {**pending, **pending_stages}:
+            changes = [
+                (print_nr, last_change_date, current_change_date)
+                for print_nr, (last_change_date, current_change_date) in pending.get(
+                    user_id, {}
+                ).items()
+            ]
+            stage_changes = [
+                (print_nr, previous_stage, current_stage)
+                for print_nr, (previous_stage, current_stage) in pending_stages.get(
+                    user_id, {}
+                ).items()
+            ]
+            messages.extend(
+                ("user", user_id, part, None)
+                for part in format_digest(changes, stage_changes)
+            )
+            settled.extend(
+                (user_id, print_nr, current_change_date)
+                for print_nr, _, current_change_date in changes
+            )
+        self.outbox.put_many(messages)
+        return settled
@@ -0,0 +1,343 @@
+import asyncio
+import collections
+import discord
+import logging
+import os
+import sqlite3
+import time
+from src.utils.metrics import DISCORD_SEND_LATENCY, DISCORD_SEND_FAILURES
+from src.utils.rate_limit import RateLimiter, KeyedRateLimiter
+from src.config import (
+    OUTBOX_SENDS_PER_SECOND,
+    OUTBOX_WORKERS,
+    OUTBOX_TARGET_SENDS_PER_SECOND,
+    OUTBOX_TARGET_BURST,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_BACKOFF_BASE_SECONDS,
+    OUTBOX_BACKOFF_MAX_SECONDS,
+    OUTBOX_POLL_SECONDS,
+)
+
+OutboxMessage = collections.namedtuple(
+    "OutboxMessage", "id target_type target_id content attempts"
+)
+
+
+class Outbox:
+    """
+    Durable queue of messages waiting to be sent to Discord.
+
+    Messages are stored in SQLite before anything is sent, and removed only
+    after Discord accepted them, so delivery is at-least-once across
+    failures and restarts. Messages for one target (user or channel) are
+    delivered in the order they were queued.
+
+    Args:
+        path (str): Path to the database file.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " target_type TEXT NOT NULL,"
+                " target_id TEXT NOT NULL,"
+                " content TEXT NOT NULL,"
+                " partition_key INTEGER,"
+                " status TEXT NOT NULL DEFAULT 'pending',"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt_at REAL NOT NULL,"
+                " last_error TEXT)"
+            )
+            columns = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")
+            }
+            if "partition_key" not in columns:
+                # Databases created before sharding support.
+                self._conn.execute(
+                    "ALTER TABLE outbox ADD COLUMN partition_key INTEGER"
+                )
+                self._conn.execute(
+                    "UPDATE outbox SET partition_key = CAST(target_id AS INTEGER)"
+                )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_outbox_target"
+                " ON outbox (status, target_type, target_id, id)"
+            )
+        self._wakeup = asyncio.Event()
+
+    def close(self):
+        """Closes the database connection."""
+        self._conn.close()
+
+    def put(self, target_type, target_id, content, partition_key=None):
+        """
+        Queues a message for a "user" or "channel" target.
+
+        Args:
+            partition_key (int): Discord id deciding which shard delivers the
+                message: the guild id for channels. Defaults to target_id.
+        """
+        self.put_many([(target_type, target_id, content, partition_key)])
+
+    def put_many(self, messages):
+        """
+        Queues (target_type, target_id, content, partition_key) messages in
+        one transaction.
+        """
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO outbox"
+                " (target_type, target_id, content, partition_key, next_attempt_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        target_type,
+                        str(target_id),
+                        content,
+                        int(partition_key if partition_key is not None else target_id),
+                        now,
+                    )
+                    for target_type, target_id, content, partition_key in messages
+                ],
+            )
+        self._wakeup.set()
+
+    def pending_count(self):
+        """Returns the number of messages waiting to be sent."""
+        (count,) = self._conn.execute(
+            "SELECT COUNT(*) FROM outbox WHERE status = 'pending'"
+        ).fetchone()
+        return count
+
+    def due_messages(self, limit, shard_ids=None, shard_count=None):
+        """
+        Returns the oldest pending message of each target that is due.
+
+        Later messages of a target wait until the earlier ones are sent.
+        With shard_ids, only messages whose partition key maps to one of
+        those shards are returned.
+        """
+        query = (
+            "SELECT id, target_type, target_id, content, attempts FROM outbox"
+            " WHERE id IN (SELECT MIN(id) FROM outbox WHERE status = 'pending'"
+            " GROUP BY target_type, target_id)"
+            " AND next_attempt_at <= ?"
+        )
+        params = [time.time()]
+        if shard_ids is not None:
+            # Same formula as sharding.shard_for.
+            query += (
+                " AND (partition_key >> 22) % ?"
+                f" IN ({', '.join('?' * len(shard_ids))})"
+            )
+            params += [shard_count, *shard_ids]
+        rows = self._conn.execute(query + " ORDER BY id LIMIT ?", [*params, limit])
+        return [OutboxMessage(*row) for row in rows]
+
+    def mark_sent(self, message_id):
+        """Removes a delivered message."""
+        with self._conn:
+            self._conn.execute("DELETE FROM outbox WHERE id = ?", (message_id,))
+
+    def mark_dead(self, message_id, error):
+        """Keeps a message that can never be delivered out of the queue."""
+        with self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'dead', last_error = ? WHERE id = ?",
+                (str(error), message_id),
+            )
+
+    def retry_later(self, message_id, error, delay=None):
+        """
+        Schedules another attempt with exponential backoff.
+
+        Returns:
+            bool: False if the message ran out of attempts and was dropped.
+        """
+        (attempts,) = self._conn.execute(
+            "SELECT attempts FROM outbox WHERE id = ?", (message_id,)
+        ).fetchone()
+        attempts += 1
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            self.mark_dead(message_id, error)
+            return False
+        if delay is None:
+            delay = min(
+                OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1),
+                OUTBOX_BACKOFF_MAX_SECONDS,
+            )
+        with self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ?"
+                " WHERE id = ?",
+                (attempts, time.time() + delay, str(error), message_id),
+            )
+        return True
+
+    def notify(self):
+        """Wakes up a sender waiting for messages."""
+        self._wakeup.set()
+
+    async def wait_for_messages(self, timeout):
+        """Waits until a message is queued or the timeout passes."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+
+class OutboxSender:
+    """
+    Delivers messages from the outbox to Discord.
+
+    A pool of up to OUTBOX_WORKERS sends runs concurrently and is refilled
+    as soon as a send finishes, so one slow target does not hold up the
+    others. Sends are limited globally and per target; a target never has
+    more than one send in flight, which keeps its messages in order.
+    Rate-limited and failed sends are retried with exponential backoff;
+    users with DMs disabled and deleted channels are not retried.
+
+    Args:
+        bot (commands.Bot): The bot instance.
+        outbox (Outbox): The queue to drain.
+        shard_ids (list): Shards run by this process. Only messages for
+            their guilds and users are sent; None sends everything.
+        shard_count (int): Total number of shards across all processes.
+    """
+
+    def __init__(self, bot, outbox, shard_ids=None, shard_count=None):
+        self.bot = bot
+        self.outbox = outbox
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.rate_limiter = RateLimiter(OUTBOX_SENDS_PER_SECOND)
+        self.target_rate_limiter = KeyedRateLimiter(
+            OUTBOX_TARGET_SENDS_PER_SECOND, OUTBOX_TARGET_BURST
+        )
+        # Format: {message_id: send_task}
+        self._in_flight = {}
+        self._task = None
+
+    def start(self):
+        """Starts the background delivery loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stops the background delivery loop and cancels sends in flight."""
+        tasks = list(self._in_flight.values())
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        # Cancelled messages stay pending and are sent after a restart.
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self):
+        """Sends due messages until cancelled."""
+        while True:
+            try:
+                started = self._start_due()
+            except Exception as e:
+                logging.error(f"Error draining outbox: {e}", exc_info=True)
+                started = 0
+            if not started:
+                # Woken up by new messages or by a finished send.
+                await self.outbox.wait_for_messages(OUTBOX_POLL_SECONDS)
+
+    async def send_due(self):
+        """
+        Sends the messages that are due and waits for them.
+
+        Returns:
+            int: The number of messages attempted.
+        """
+        started = self._start_due()
+        await asyncio.gather(*self._in_flight.values())
+        return started
+
+    def _start_due(self):
+        """Starts sending due messages while there are free workers."""
+        free = OUTBOX_WORKERS - len(self._in_flight)
+        if free <= 0:
+            return 0
+        # A target's oldest message is returned until it is sent, so the
+        # ones in flight are skipped to keep at most one send per target.
+        messages = [
+            message
+            for message in self.outbox.due_messages(
+                free + len(self._in_flight), self.shard_ids, self.shard_count
+            )
+            if message.id not in self._in_flight
+        ][:free]
+        for message in messages:
+            task = asyncio.create_task(self._deliver(message))
+            self._in_flight[message.id] = task
+            task.add_done_callback(
+                lambda _, message_id=message.id: self._finished(message_id)
+            )
+        return len(messages)
+
+    def _finished(self, message_id):
+        self._in_flight.pop(message_id, None)
+        self.outbox.notify()
+
+    async def _resolve(self, message):
+        """Returns the user or channel a message is addressed to."""
+        target_id = int(message.target_id)
+        if message.target_type == "user":
+            destination = self.bot.get_user(target_id)
+            if destination is None:
+                await self.rate_limiter.acquire()
+                destination = await self.bot.fetch_user(target_id)
+        else:
+            destination = self.bot.get_channel(target_id)
+            if destination is None:
+                await self.rate_limiter.acquire()
+                destination = await self.bot.fetch_channel(target_id)
+        return destination
+
+    async def _deliver(self, message):
+        target = f"{message.target_type} {message.target_id}"
+        try:
+            destination = await self._resolve(message)
+            await self.target_rate_limiter.acquire(
+                (message.target_type, message.target_id)
+            )
+            await self.rate_limiter.acquire()
+            with DISCORD_SEND_LATENCY.time(target_type=message.target_type):
+                await destination.send(message.content)
+        except (discord.Forbidden, discord.NotFound) as e:
+            logging.warning(f"Cannot deliver message to {target}: {e}")
+            self._count_failure(message, "undeliverable")
+            self.outbox.mark_dead(message.id, e)
+        except discord.HTTPException as e:
+            rate_limited = e.status == 429
+            self._count_failure(message, "rate_limited" if rate_limited else "error")
+            delay = getattr(e, "retry_after", None) if rate_limited else None
+            self._retry(message, target, e, delay)
+        except Exception as e:
+            self._count_failure(message, "error")
+            self._retry(message, target, e)
+        else:
+            self.outbox.mark_sent(message.id)
+
+    @staticmethod
+    def _count_failure(message, reason):
+        DISCORD_SEND_FAILURES.inc(target_type=message.target_type, reason=reason)
+
+    def _retry(self, message, target, error, delay=None):
+        if self.outbox.retry_later(message.id, error, delay):
+            logging.warning(f"Error sending message to {target}, will retry: {error}")
+        else:
+            logging.error(f"Giving up sending message to {target}: {error}")
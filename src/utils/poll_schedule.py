@@ -0,0 +1,134 @@
+import datetime
+import heapq
+
+
+class PollSchedule:
+    """
+    Per-print polling schedule kept in a heap keyed by the next check time.
+
+    A print that changed is checked again after min_interval. Every check
+    that finds no change doubles the interval, up to max_interval, or up
+    to dormant_max_interval for prints that have not changed for
+    dormant_after seconds or whose legislative process has concluded.
+
+    Args:
+        min_interval (float): Seconds between checks of an active print.
+        max_interval (float): Longest interval for other prints.
+        dormant_max_interval (float): Longest interval for dormant or
+            concluded prints.
+        dormant_after (float): Seconds without a change after which a
+            print is dormant.
+    """
+
+    def __init__(self, min_interval, max_interval, dormant_max_interval, dormant_after):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.dormant_max_interval = dormant_max_interval
+        self.dormant_after = dormant_after
+        # Format: {print_nr: (next_check, interval)}
+        self._entries = {}
+        # Heap of (next_check, print_nr); entries that no longer match
+        # self._entries are skipped when popped.
+        self._heap = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, print_nr):
+        return print_nr in self._entries
+
+    def to_state(self):
+        """Returns the schedule as JSON-serializable data."""
+        return {
+            print_nr: [next_check, interval]
+            for print_nr, (next_check, interval) in self._entries.items()
+        }
+
+    def load_state(self, state):
+        """Restores a schedule saved with to_state."""
+        self._entries = {
+            print_nr: (next_check, interval)
+            for print_nr, (next_check, interval) in state.items()
+        }
+        self._heap = [
+            (next_check, print_nr)
+            for print_nr, (next_check, _) in self._entries.items()
+        ]
+        heapq.heapify(self._heap)
+
+    def sync(self, print_nrs, now):
+        """
+        Matches the schedule to the watched prints.
+
+        New prints are due immediately; prints nobody watches any more are
+        dropped.
+
+        Returns:
+            bool: True if any print was added or dropped.
+        """
+        removed = self._entries.keys() - print_nrs
+        for print_nr in removed:
+            del self._entries[print_nr]
+        added = [print_nr for print_nr in print_nrs if print_nr not in self._entries]
+        for print_nr in added:
+            self._schedule(print_nr, now, self.min_interval)
+        return bool(removed or added)
+
+    def pop_due(self, now):
+        """Removes and returns the prints whose check is due, earliest first."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            next_check, print_nr = heapq.heappop(self._heap)
+            entry = self._entries.get(print_nr)
+            if entry is not None and entry[0] == next_check:
+                due.append(print_nr)
+        return due
+
+    def next_check(self):
+        """Returns the time of the earliest scheduled check, or None."""
+        while self._heap:
+            next_check, print_nr = self._heap[0]
+            entry = self._entries.get(print_nr)
+            if entry is not None and entry[0] == next_check:
+                return next_check
+            heapq.heappop(self._heap)
+        return None
+
+    def reschedule(
+        self, print_nr, now, changed, last_change_date=None, concluded=False
+    ):
+        """
+        Schedules the next check of a print after it was checked.
+
+        Args:
+            changed (bool): Whether the check found a change. None if the
+                check failed; the print is then retried at the same interval.
+            last_change_date (str): The print's latest known change date,
+                used to tell dormant prints apart.
+            concluded (bool): Whether the print's process has concluded.
+        """
+        if print_nr not in self._entries:
+            return
+        _, interval = self._entries[print_nr]
+        if changed:
+            interval = self.min_interval
+        elif changed is not None:
+            dormant = concluded or self._is_dormant(last_change_date, now)
+            limit = self.dormant_max_interval if dormant else self.max_interval
+            interval = min(interval * 2, limit)
+        self._schedule(print_nr, now + interval, interval)
+
+    def _schedule(self, print_nr, next_check, interval):
+        self._entries[print_nr] = (next_check, interval)
+        heapq.heappush(self._heap, (next_check, print_nr))
+
+    def _is_dormant(self, last_change_date, now):
+        if not last_change_date:
+            return False
+        try:
+            changed_at = datetime.datetime.fromisoformat(last_change_date)
+        except ValueError:
+            return False
+        if changed_at.tzinfo is None:
+            changed_at = changed_at.replace(tzinfo=datetime.timezone.utc)
+        return now - changed_at.timestamp() > self.dormant_after
@@ -0,0 +1,167 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+from src.config import PRINTS_PAGE_SIZE
+
+
+class PrintMirror:
+    """
+    Local on-disk mirror of the term's prints.
+
+    Prints are kept in SQLite and refreshed incrementally by walking the
+    print list sorted by change date back to the point reached by the
+    previous completed sync. Process documents are stored as they are
+    fetched, so they remain available while the API is down.
+
+    Args:
+        path (str): Path to the database file.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._sync_lock = asyncio.Lock()
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS prints ("
+                " number TEXT PRIMARY KEY,"
+                " delivery_date TEXT NOT NULL,"
+                " change_date TEXT NOT NULL,"
+                " document TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_prints_delivery_date"
+                " ON prints (delivery_date)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS processes ("
+                " number TEXT PRIMARY KEY,"
+                " document TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def close(self):
+        """Closes the database connection."""
+        self._conn.close()
+
+    @property
+    def synced_through(self):
+        """Newest change date covered by a completed sync, or None."""
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'synced_through'"
+        ).fetchone()
+        return row[0] if row else None
+
+    @property
+    def is_ready(self):
+        """Whether at least one full sync has completed."""
+        return self.synced_through is not None
+
+    def upsert_prints(self, print_items):
+        """Stores or replaces print documents from the API."""
+        rows = [
+            (
+                str(item.get("number")),
+                item.get("deliveryDate", ""),
+                item.get("changeDate", ""),
+                json.dumps(item),
+            )
+            for item in print_items
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO prints VALUES (?, ?, ?, ?)", rows
+            )
+
+    def get_print(self, print_nr):
+        """Returns the mirrored print document, or None."""
+        row = self._conn.execute(
+            "SELECT document FROM prints WHERE number = ?", (str(print_nr),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def all_prints(self):
+        """Yields every mirrored print document."""
+        for (document,) in self._conn.execute("SELECT document FROM prints"):
+            yield json.loads(document)
+
+    def get_change_dates(self):
+        """Returns {print_nr: change_date} for every mirrored print."""
+        return dict(self._conn.execute("SELECT number, change_date FROM prints"))
+
+    def recent_prints(self, cutoff_date):
+        """Returns prints delivered on or after the cutoff date, newest first."""
+        return [
+            json.loads(document)
+            for (document,) in self._conn.execute(
+                "SELECT document FROM prints WHERE delivery_date >= ?"
+                " ORDER BY delivery_date DESC",
+                (cutoff_date,),
+            )
+        ]
+
+    def store_process(self, process_nr, process_data):
+        """Stores a fetched process document."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO processes VALUES (?, ?)",
+                (str(process_nr), json.dumps(process_data)),
+            )
+
+    def get_process(self, process_nr):
+        """Returns the stored process document, or None."""
+        row = self._conn.execute(
+            "SELECT document FROM processes WHERE number = ?", (str(process_nr),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def sync(self, api):
+        """
+        Brings the mirror up to date with the API.
+
+        Args:
+            api (SejmApi): The client used to walk the print list.
+
+        Returns:
+            int: The number of prints stored.
+        """
+        async with self._sync_lock:
+            since = self.synced_through or ""
+            newest_change_date = since
+            stored = 0
+            page = []
+            async with contextlib.aclosing(
+                api.iter_prints("-changeDate")
+            ) as changed_prints:
+                async for print_item in changed_prints:
+                    change_date = print_item.get("changeDate", "")
+                    # Entries equal to the mark are stored again in case more
+                    # prints changed within the same second.
+                    if change_date < since:
+                        break
+                    newest_change_date = max(newest_change_date, change_date)
+                    page.append(print_item)
+                    if len(page) >= PRINTS_PAGE_SIZE:
+                        self.upsert_prints(page)
+                        stored += len(page)
+                        page = []
+            self.upsert_prints(page)
+            stored += len(page)
+
+            # Only a completed walk moves the mark, so an interrupted sync
+            # is redone from the same point next time.
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('synced_through', ?)",
+                    (newest_change_date,),
+                )
+            logging.info(f"Print mirror synced {stored} prints since {since or '-'}")
+            return stored
@@ -0,0 +1,31 @@
+import hashlib
+import json
+
+
+def stage_label(process_data):
+    """Describes the current stage of a legislative process, as shown by !druk."""
+    stages = process_data.get("stages", [])
+    if process_data.get("passed", False):
+        return f"Uchwalono {process_data.get('closureDate', 'Brak daty')}"
+    if stages:
+        return stages[-1].get("stageName", "Brak informacji o etapie")
+    return "Brak informacji o etapie"
+
+
+def snapshot_hash(process_data):
+    """
+    Hashes the parts of a process that define its stage.
+
+    Processes whose hash matches the stored one are skipped without
+    comparing anything else.
+    """
+    snapshot = {
+        "passed": process_data.get("passed", False),
+        "closureDate": process_data.get("closureDate"),
+        "stages": [
+            (stage.get("stageName"), stage.get("date"))
+            for stage in process_data.get("stages", [])
+        ],
+    }
+    encoded = json.dumps(snapshot, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha1(encoded).hexdigest()
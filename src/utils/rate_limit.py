@@ -0,0 +1,77 @@
+import asyncio
+import time
+import urllib.parse
+
+
+class RateLimiter:
+    """
+    Async token bucket limiting how often requests may be started.
+
+    Args:
+        rate (float): Number of requests allowed per second.
+        burst (int): Number of requests that may start back to back
+            before the rate applies. Defaults to one second worth of tokens.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Waits until a request may be started."""
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            # Waiters queue on the lock, so tokens are handed out in order.
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+            self._tokens = 0.0
+            self._updated = time.monotonic()
+
+
+class KeyedRateLimiter:
+    """
+    Keeps a separate RateLimiter for every key, e.g. every Discord channel.
+
+    Limiters idle long enough to have refilled are dropped once more than
+    max_keys exist, since a fresh limiter behaves the same.
+    """
+
+    def __init__(self, rate, burst=None, max_keys=1024):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._limiters = {}
+
+    async def acquire(self, key):
+        """Waits until a request for the given key may be started."""
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            if len(self._limiters) >= self.max_keys:
+                self._prune()
+            limiter = self._limiters[key] = RateLimiter(self.rate, self.burst)
+        await limiter.acquire()
+
+    def _prune(self):
+        now = time.monotonic()
+        for key, limiter in list(self._limiters.items()):
+            if not limiter._lock.locked() and (
+                now - limiter._updated >= limiter.burst / limiter.rate
+            ):
+                del self._limiters[key]
+
+
+class HostRateLimiter(KeyedRateLimiter):
+    """Keeps a separate RateLimiter for every host requests are sent to."""
+
+    async def acquire(self, url):
+        """Waits until a request to the host of the given URL may be started."""
+        await super().acquire(urllib.parse.urlsplit(url).netloc)
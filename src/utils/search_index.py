@@ -0,0 +1,152 @@
+import math
+import re
+import unicodedata
+
+# Letters that Unicode decomposition does not fold to ASCII
+_EXTRA_FOLDS = str.maketrans({"ł": "l", "Ł": "L"})
+
+_TOKEN_RE = re.compile(r"\w+")
+
+STOPWORDS = frozenset(
+    "a aby albo ani czy dla do i jak jest lub na nad nie o od oraz po pod przez "
+    "przy se sie to u w we z za ze".split()
+)
+
+# Common Polish inflectional endings (diacritics folded), longest first
+_SUFFIXES = sorted(
+    "owania owanie owaniu aniu ania anie eniu enia enie owych owej owym owego owy owa owe "
+    "ami ach ego emu ych ymi imi iej owi ow om em ej ym ie ia a e i y u o".split(),
+    key=len,
+    reverse=True,
+)
+_MIN_STEM_LENGTH = 4
+# Stems are truncated so that forms with stem alternations (podatek/podatku)
+# still meet
+_MAX_STEM_LENGTH = 5
+
+
+def fold_diacritics(text):
+    """Lowercases text and strips Polish diacritics (ą -> a, ł -> l, ...)."""
+    decomposed = unicodedata.normalize("NFKD", text.translate(_EXTRA_FOLDS))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def stem(token):
+    """Strips one common inflectional ending and truncates the stem."""
+    if token.isdigit():
+        return token
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM_LENGTH:
+            token = token[: -len(suffix)]
+            break
+    return token[:_MAX_STEM_LENGTH]
+
+
+def tokenize(text):
+    """Splits text into folded, stemmed search terms."""
+    return [
+        stem(token)
+        for token in _TOKEN_RE.findall(fold_diacritics(text))
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over print titles.
+
+    Prints can be added at any time; re-adding a print replaces its
+    previous entry, so the index is kept current incrementally.
+    """
+
+    def __init__(self):
+        # Format: {term: {print_nr: term_frequency}}
+        self._postings = {}
+        # Format: {print_nr: (title, delivery_date, terms)}
+        self._documents = {}
+        self.newest_delivery_date = ""
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, print_nr):
+        return str(print_nr) in self._documents
+
+    def add(self, print_nr, title, delivery_date=""):
+        """Indexes a print, replacing any previous entry for it."""
+        print_nr = str(print_nr)
+        existing = self._documents.get(print_nr)
+        if existing is not None and existing[0] == title:
+            return
+        self.remove(print_nr)
+
+        terms = {}
+        for term in tokenize(title):
+            terms[term] = terms.get(term, 0) + 1
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[print_nr] = frequency
+        self._documents[print_nr] = (title, delivery_date, tuple(terms))
+        self.newest_delivery_date = max(self.newest_delivery_date, delivery_date)
+
+    def add_prints(self, print_items):
+        """Indexes print documents as returned by the API."""
+        for item in print_items:
+            if item.get("number") is not None:
+                self.add(
+                    item["number"], item.get("title", ""), item.get("deliveryDate", "")
+                )
+
+    def remove(self, print_nr):
+        """Removes a print from the index."""
+        document = self._documents.pop(str(print_nr), None)
+        if document is None:
+            return
+        for term in document[2]:
+            postings = self._postings[term]
+            del postings[str(print_nr)]
+            if not postings:
+                del self._postings[term]
+
+    def get(self, print_nr):
+        """Returns (title, delivery_date) of an indexed print, or None."""
+        document = self._documents.get(str(print_nr))
+        return document[:2] if document else None
+
+    def search(self, query, limit=10):
+        """
+        Finds prints whose titles match the query.
+
+        Prints matching more query terms rank first; ties are broken by a
+        TF-IDF score and then by the newest print number.
+
+        Returns:
+            list: Up to `limit` print numbers, best match first.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        total = len(self._documents)
+        matched = {}
+        scores = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            for print_nr, frequency in postings.items():
+                matched[print_nr] = matched.get(print_nr, 0) + 1
+                scores[print_nr] = scores.get(print_nr, 0.0) + frequency * idf
+
+        ranked = sorted(
+            matched,
+            key=lambda nr: (matched[nr], scores[nr], _number_key(nr)),
+            reverse=True,
+        )
+        return ranked[:limit]
+
+
+def _number_key(print_nr):
+    """Sort key putting higher (newer) print numbers first, e.g. 1000-A."""
+    digits = re.match(r"\d+", print_nr)
+    return (int(digits.group()) if digits else 0, print_nr)
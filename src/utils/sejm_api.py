@@ -0,0 +1,236 @@
+import aiohttp
+import asyncio
+import logging
+import urllib.parse
+from src.utils.cache import AsyncTTLCache
+from src.utils.metrics import SEJM_API_LATENCY, SEJM_API_REQUESTS, track_cache
+from src.utils.rate_limit import HostRateLimiter
+from src.utils.search_index import SearchIndex
+from src.config import (
+    PRINTS_ENDPOINT,
+    PROCESSES_ENDPOINT,
+    API_RATE_LIMIT_PER_SECOND,
+    API_CACHE_SIZE,
+    API_CACHE_TTL_SECONDS,
+    API_CACHE_NOT_FOUND_TTL_SECONDS,
+    PRINTS_PAGE_SIZE,
+)
+
+
+class SejmApiError(Exception):
+    """Raised when the Sejm API answers a list request with an error status."""
+
+
+class SejmApi:
+    """
+    Client for the Sejm API shared by all cogs.
+
+    Print and process documents are served from an in-memory cache, and
+    every request goes through a per-host rate limiter. Returned documents
+    are shared between callers and must not be modified.
+
+    With a print mirror attached, prints are read from the mirror without a
+    network round-trip, and processes fall back to their stored copy when
+    the API cannot be reached.
+
+    Every page of the print list fetched by any component is added to the
+    search index, so the index stays current without extra requests.
+
+    Args:
+        session (aiohttp.ClientSession): The shared HTTP session.
+        mirror (PrintMirror): Optional local mirror of the term's prints.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, mirror=None):
+        self.session = session
+        self.mirror = mirror
+        self.search_index = SearchIndex()
+        self.rate_limiter = HostRateLimiter(API_RATE_LIMIT_PER_SECOND)
+        self.cache = AsyncTTLCache(API_CACHE_SIZE, API_CACHE_TTL_SECONDS)
+        track_cache("sejm_api", self.cache)
+        # Format: {url: (etag, last_modified, change_date)}
+        self._validators = {}
+
+    async def fetch_print(self, print_nr):
+        """
+        Fetches a print document.
+
+        Returns:
+            tuple: The HTTP status and the parsed JSON (None unless status is 200).
+        """
+        if self.mirror is not None:
+            mirrored = self.mirror.get_print(print_nr)
+            if mirrored is not None:
+                return 200, mirrored
+        return await self._get_cached(f"{PRINTS_ENDPOINT}/{print_nr}")
+
+    async def fetch_process(self, process_nr):
+        """
+        Fetches a legislative process document.
+
+        Returns:
+            tuple: The HTTP status and the parsed JSON (None unless status is 200).
+        """
+        url = f"{PROCESSES_ENDPOINT}/{process_nr}"
+        try:
+            status, process_data = await self.cache.get_or_fetch(
+                url,
+                lambda: self._fetch_and_mirror_process(url, process_nr),
+                ttl=self._ttl_for,
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            mirrored = self._mirrored_process(process_nr)
+            if mirrored is None:
+                raise
+            logging.warning(f"Serving process {process_nr} from the mirror")
+            return 200, mirrored
+
+        if status not in (200, 404):
+            mirrored = self._mirrored_process(process_nr)
+            if mirrored is not None:
+                logging.warning(f"Serving process {process_nr} from the mirror")
+                return 200, mirrored
+        return status, process_data
+
+    async def _fetch_and_mirror_process(self, url, process_nr):
+        """Fetches a process and keeps a copy in the mirror."""
+        status, process_data = await self.get_json(url)
+        if status == 200 and self.mirror is not None:
+            self.mirror.store_process(process_nr, process_data)
+        return status, process_data
+
+    def _mirrored_process(self, process_nr):
+        if self.mirror is None:
+            return None
+        return self.mirror.get_process(process_nr)
+
+    async def fetch_print_if_modified(self, print_nr):
+        """
+        Fetches a print document with a conditional request.
+
+        The ETag and Last-Modified validators of the previous response are
+        sent back, so an unchanged print costs a 304 without a body. Servers
+        that ignore the validators simply answer with the full document.
+
+        The print's changeDate is stored with the validators, so callers
+        can still compare it with what their watchers last saw when the
+        answer is a 304.
+
+        Returns:
+            tuple: The HTTP status (304 when unchanged) and the parsed JSON,
+                which on a 304 only holds the stored changeDate (None unless
+                status is 200 or 304).
+        """
+        url = f"{PRINTS_ENDPOINT}/{print_nr}"
+        cached = self.cache.get(url)
+        if cached is not None:
+            return cached
+
+        etag, last_modified, change_date = self._validators.get(url, (None, None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        await self.rate_limiter.acquire(url)
+        endpoint = self._endpoint_name(url)
+        with SEJM_API_LATENCY.time(endpoint=endpoint):
+            async with self.session.get(url, headers=headers) as response:
+                SEJM_API_REQUESTS.inc(endpoint=endpoint, status=response.status)
+                if response.status == 304:
+                    return 304, {"changeDate": change_date}
+                if response.status != 200:
+                    return response.status, None
+                data = await response.json()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+
+        if etag or last_modified:
+            self._validators[url] = (etag, last_modified, data.get("changeDate"))
+        result = (200, data)
+        self.cache.set(url, result, self._ttl_for(result))
+        return result
+
+    async def iter_prints(self, sort_by, page_size=PRINTS_PAGE_SIZE):
+        """
+        Iterates over the print list page by page.
+
+        Pages are requested with limit/offset only as the caller consumes
+        them, so breaking out of the loop early stops further downloads.
+
+        Args:
+            sort_by (str): Sort order, e.g. "-deliveryDate" or "-changeDate".
+            page_size (int): Number of prints requested per page.
+
+        Yields:
+            dict: The next print in the requested order.
+
+        Raises:
+            SejmApiError: If a page cannot be fetched.
+        """
+        offset = 0
+        while True:
+            query = urllib.parse.urlencode(
+                {"sort_by": sort_by, "limit": page_size, "offset": offset}
+            )
+            url = f"{PRINTS_ENDPOINT}?{query}"
+            status, page = await self.get_json(url)
+            if status != 200:
+                raise SejmApiError(f"HTTP {status} for {url}")
+
+            self.search_index.add_prints(page)
+            for print_item in page:
+                yield print_item
+
+            # A page larger than requested means the API ignored the
+            # limit and already returned everything.
+            if len(page) != page_size:
+                return
+            offset += page_size
+
+    async def get_json(self, url):
+        """
+        Sends a rate-limited GET request, bypassing the cache.
+
+        Returns:
+            tuple: The HTTP status and the parsed JSON (None unless status is 200).
+        """
+        await self.rate_limiter.acquire(url)
+        endpoint = self._endpoint_name(url)
+        with SEJM_API_LATENCY.time(endpoint=endpoint):
+            async with self.session.get(url) as response:
+                SEJM_API_REQUESTS.inc(endpoint=endpoint, status=response.status)
+                if response.status != 200:
+                    return response.status, None
+                return response.status, await response.json()
+
+    @staticmethod
+    def _endpoint_name(url):
+        """Names the endpoint of a URL for metrics, e.g. "prints" or "prints_list"."""
+        path = urllib.parse.urlsplit(url).path.rstrip("/")
+        for endpoint_url, name in (
+            (PRINTS_ENDPOINT, "prints"),
+            (PROCESSES_ENDPOINT, "processes"),
+        ):
+            endpoint_path = urllib.parse.urlsplit(endpoint_url).path.rstrip("/")
+            if path == endpoint_path:
+                return f"{name}_list"
+            if path.startswith(f"{endpoint_path}/"):
+                return name
+        return "other"
+
+    async def _get_cached(self, url):
+        return await self.cache.get_or_fetch(
+            url, lambda: self.get_json(url), ttl=self._ttl_for
+        )
+
+    @staticmethod
+    def _ttl_for(result):
+        """Caches found and missing documents; errors are always re-fetched."""
+        status, _ = result
+        if status == 200:
+            return API_CACHE_TTL_SECONDS
+        if status == 404:
+            return API_CACHE_NOT_FOUND_TTL_SECONDS
+        return 0
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from src.config import LEADER_LEASE_SECONDS
+
+
+def shard_for(snowflake, shard_count):
+    """
+    Returns the shard a guild (or any other Discord id) belongs to.
+
+    Uses the same formula as the Discord gateway, so guild ids map to the
+    shard that receives their events.
+    """
+    return (int(snowflake) >> 22) % shard_count
+
+
+class LocalCoordinator:
+    """
+    Elects one leader among bot processes running on the same host.
+
+    A stand-in for an external coordinator: the leader holds a lease row in
+    an SQLite database shared by all processes and renews it in the
+    background. When the leader stops renewing, another process takes the
+    lease over once it expires.
+
+    Args:
+        path (str): Path to the database file shared by the processes.
+        name (str): Name of the lease, one leader is elected per name.
+        lease_seconds (float): How long a lease is valid without renewal.
+    """
+
+    def __init__(self, path, name="leader", lease_seconds=LEADER_LEASE_SECONDS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.node_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            " name TEXT PRIMARY KEY,"
+            " holder TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._task = None
+
+    def close(self):
+        """Closes the database connection."""
+        self._conn.close()
+
+    def try_acquire(self):
+        """
+        Takes or renews the lease if it is free, expired or already ours.
+
+        Returns:
+            bool: True if this process is the leader.
+        """
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute(
+                "SELECT holder, expires_at FROM leases WHERE name = ?", (self.name,)
+            ).fetchone()
+            if row is None or row[0] == self.node_id or row[1] <= now:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                    (self.name, self.node_id, now + self.lease_seconds),
+                )
+                leader = True
+            else:
+                leader = False
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        if leader != self.is_leader:
+            logging.info(
+                f"{self.node_id} {'became' if leader else 'is no longer'} the leader"
+            )
+        self.is_leader = leader
+        return leader
+
+    def release(self):
+        """Gives up the lease so another process can take over immediately."""
+        self._conn.execute(
+            "DELETE FROM leases WHERE name = ? AND holder = ?",
+            (self.name, self.node_id),
+        )
+        self.is_leader = False
+
+    def start(self):
+        """Starts renewing the lease in the background."""
+        if self._task is None or self._task.done():
+            self.try_acquire()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops renewing the lease and releases it."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.release()
+
+    async def _run(self):
+        while True:
+            # Renew well before the lease runs out.
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                self.try_acquire()
+            except Exception as e:
+                logging.error(f"Error renewing leader lease: {e}", exc_info=True)
+                self.is_leader = False
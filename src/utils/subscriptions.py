@@ -0,0 +1,405 @@
+import datetime
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, MutableMapping
+
+# Change dates in the API's format are stored as seconds since this moment;
+# values with this bit set are ids in the table of other change dates.
+_EPOCH = datetime.datetime(2000, 1, 1)
+_LISTED_DATE = 1 << 31
+
+
+class SubscriptionTable(MutableMapping):
+    """
+    Compact in-memory table of watched prints.
+
+    Behaves like the {user_id: {print_nr: last_change_date}} dict it
+    replaces, but stores every user id, print number and change date
+    once and refers to them by 32-bit integer ids:
+
+    - a print's first subscriber and the change date they last saw are
+      kept in arrays shared by all prints; further subscribers go to an
+      array of the print's own holding their user ids, sorted, followed
+      by their date ids,
+    - likewise a user's first watched print is kept in an array shared by
+      all users and only users watching more prints get their own array,
+    - change dates in the API's format (2024-03-01T12:00:00) are stored as
+      seconds; any other value lives in a deduplicated table.
+
+    A subscription therefore costs 12 bytes on top of the per-user and
+    per-print entries, and a user or print with a single subscription
+    needs no container of its own. Ids of users, prints and dates nobody
+    refers to any more are reused.
+    """
+
+    def __init__(self, data=None):
+        self._users = _IdTable()
+        self._prints = _IdTable()
+        self._dates = _IdTable()
+        # Indexed by print id: the first subscriber's user id and date id.
+        self._print_first_user = array("I")
+        self._print_first_date = array("I")
+        # Format: {print id: array of the other subscribers' user ids,
+        # sorted, followed by their date ids in the same order}
+        self._print_more_subscribers = {}
+        # Indexed by user id: the id of the first print the user watches.
+        self._user_first_print = array("I")
+        # Format: {user id: array of the ids of the user's other prints}
+        self._user_more_prints = {}
+        if data:
+            self.update(data)
+
+    def __getitem__(self, user_id):
+        user_id = str(user_id)
+        if user_id not in self._users:
+            raise KeyError(user_id)
+        return _UserPrints(self, user_id)
+
+    def __setitem__(self, user_id, prints):
+        """Replaces all prints watched by a user."""
+        user_id = str(user_id)
+        prints = dict(prints)
+        if user_id in self._users:
+            del self[user_id]
+        for print_nr, change_date in prints.items():
+            self.set(user_id, print_nr, change_date)
+
+    def __delitem__(self, user_id):
+        user_id = str(user_id)
+        if user_id not in self._users:
+            raise KeyError(user_id)
+        for print_nr in list(self.user_prints(user_id)):
+            self.discard(user_id, print_nr)
+
+    def __iter__(self):
+        return iter(list(self._users))
+
+    def __len__(self):
+        return len(self._users)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def clear(self):
+        self.__init__()
+
+    def get_date(self, user_id, print_nr, default=None):
+        """Returns the change date a user last saw for a print."""
+        found = self._find(str(user_id), print_nr)
+        if found is None:
+            return default
+        _, print_id, slot = found
+        return self._date_key(self._date_id(print_id, slot))
+
+    def set(self, user_id, print_nr, change_date):
+        """Adds a subscription or replaces its change date."""
+        user_id = str(user_id)
+        print_nr = str(print_nr)
+        found = self._find(user_id, print_nr)
+        date = self._acquire_date(change_date)
+        if found is not None:
+            _, print_id, slot = found
+            self._release_date(self._date_id(print_id, slot))
+            if slot == 0:
+                self._print_first_date[print_id] = date
+            else:
+                more_subscribers = self._print_more_subscribers[print_id]
+                more_subscribers[len(more_subscribers) // 2 + slot - 1] = date
+            return
+
+        new_user = user_id not in self._users
+        new_print = print_nr not in self._prints
+        user = self._users.acquire(user_id)
+        print_id = self._prints.acquire(print_nr)
+        if new_user:
+            _store(self._user_first_print, user, print_id)
+        else:
+            self._user_more_prints.setdefault(user, array("I")).append(print_id)
+        if new_print:
+            _store(self._print_first_user, print_id, user)
+            _store(self._print_first_date, print_id, date)
+        else:
+            more_subscribers = self._print_more_subscribers.get(print_id)
+            if more_subscribers is None:
+                more_subscribers = self._print_more_subscribers[print_id] = array("I")
+            count = len(more_subscribers) // 2
+            index = bisect_left(more_subscribers, user, 0, count)
+            more_subscribers.insert(count + index, date)
+            more_subscribers.insert(index, user)
+
+    def discard(self, user_id, print_nr):
+        """
+        Removes a subscription.
+
+        Returns:
+            bool: True if the user watched the print.
+        """
+        found = self._find(str(user_id), print_nr)
+        if found is None:
+            return False
+        user, print_id, slot = found
+        self._release_date(self._date_id(print_id, slot))
+
+        more_subscribers = self._print_more_subscribers.get(print_id)
+        if more_subscribers is not None:
+            count = len(more_subscribers) // 2
+            index = 0 if slot == 0 else slot - 1
+            if slot == 0:
+                self._print_first_user[print_id] = more_subscribers[0]
+                self._print_first_date[print_id] = more_subscribers[count]
+            del more_subscribers[count + index]
+            del more_subscribers[index]
+            if not more_subscribers:
+                del self._print_more_subscribers[print_id]
+        self._prints.release(print_id)
+
+        more_prints = self._user_more_prints.get(user)
+        if self._user_first_print[user] == print_id:
+            if more_prints:
+                self._user_first_print[user] = more_prints.pop(0)
+        else:
+            more_prints.remove(print_id)
+        if more_prints is not None and not more_prints:
+            del self._user_more_prints[user]
+        self._users.release(user)
+        return True
+
+    def user_prints(self, user_id):
+        """Returns {print_nr: last_change_date} for one user as a new dict."""
+        user = self._users.id(str(user_id))
+        if user is None:
+            return {}
+        prints = {}
+        for print_id in self._user_print_ids(user):
+            slot = self._slot(user, print_id)
+            prints[self._prints.key(print_id)] = self._date_key(
+                self._date_id(print_id, slot)
+            )
+        return prints
+
+    def print_subscribers(self):
+        """
+        Returns a read-only {print_nr: {user_id: last_change_date}} view.
+
+        A print's subscribers are read into a new dict only when the print
+        is looked up, so iterating over the view's items never holds more
+        than one print's subscribers.
+        """
+        return _PrintSubscribers(self)
+
+    def print_subscriber_ids(self, print_nr):
+        """Returns the ids of the users watching a print."""
+        print_id = self._prints.id(print_nr)
+        if print_id is None:
+            return []
+        return [self._users.key(user) for user, _ in self._subscriptions(print_id)]
+
+    def to_dict(self):
+        """Returns the table as {user_id: {print_nr: last_change_date}}."""
+        return {user_id: self.user_prints(user_id) for user_id in self._users}
+
+    def _user_print_ids(self, user):
+        yield self._user_first_print[user]
+        yield from self._user_more_prints.get(user, ())
+
+    def _subscriptions(self, print_id):
+        """Yields (user id, date id) for every subscriber of a print."""
+        yield self._print_first_user[print_id], self._print_first_date[print_id]
+        more_subscribers = self._print_more_subscribers.get(print_id)
+        if more_subscribers is not None:
+            count = len(more_subscribers) // 2
+            yield from zip(more_subscribers[:count], more_subscribers[count:])
+
+    def _acquire_date(self, change_date):
+        seconds = _date_seconds(change_date)
+        if seconds is not None:
+            return seconds
+        return self._dates.acquire(change_date) | _LISTED_DATE
+
+    def _release_date(self, date):
+        if date & _LISTED_DATE:
+            self._dates.release(date ^ _LISTED_DATE)
+
+    def _date_key(self, date):
+        if date & _LISTED_DATE:
+            return self._dates.key(date ^ _LISTED_DATE)
+        return (_EPOCH + datetime.timedelta(seconds=date)).isoformat()
+
+    def _date_id(self, print_id, slot):
+        if slot == 0:
+            return self._print_first_date[print_id]
+        more_subscribers = self._print_more_subscribers[print_id]
+        return more_subscribers[len(more_subscribers) // 2 + slot - 1]
+
+    def _slot(self, user, print_id):
+        """
+        Returns where the user is among the print's subscribers, or None.
+
+        Slot 0 is the print's first subscriber and slot n the nth user in
+        the print's own array.
+        """
+        if self._print_first_user[print_id] == user:
+            return 0
+        more_subscribers = self._print_more_subscribers.get(print_id)
+        if more_subscribers is None:
+            return None
+        count = len(more_subscribers) // 2
+        index = bisect_left(more_subscribers, user, 0, count)
+        if index < count and more_subscribers[index] == user:
+            return index + 1
+        return None
+
+    def _find(self, user_id, print_nr):
+        """Returns (user id, print id, slot in the print's subscribers) or None."""
+        user = self._users.id(user_id)
+        print_id = self._prints.id(str(print_nr))
+        if user is None or print_id is None:
+            return None
+        slot = self._slot(user, print_id)
+        if slot is None:
+            return None
+        return user, print_id, slot
+
+
+def _date_seconds(change_date):
+    """
+    Returns a change date in the API's format as seconds since _EPOCH.
+
+    Returns None for any value that would not read back the same, e.g. a
+    date without a time.
+    """
+    try:
+        moment = datetime.datetime.fromisoformat(change_date)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is not None or moment.isoformat() != change_date:
+        return None
+    seconds = (moment - _EPOCH) // datetime.timedelta(seconds=1)
+    if not 0 <= seconds < _LISTED_DATE or moment.microsecond:
+        return None
+    return seconds
+
+
+def _store(values, index, value):
+    """Stores value at index, growing the array by one if needed."""
+    if index == len(values):
+        values.append(value)
+    else:
+        values[index] = value
+
+
+class _IdTable:
+    """
+    Reference-counted mapping between keys and small integer ids.
+
+    Each key is stored once; its id is freed and reused once nothing
+    refers to it.
+    """
+
+    def __init__(self):
+        # Format: {key: id}
+        self._ids = {}
+        # Indexed by id; None for free ids.
+        self._keys = []
+        self._refs = array("I")
+        self._free = []
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def id(self, key):
+        return self._ids.get(key)
+
+    def key(self, key_id):
+        return self._keys[key_id]
+
+    def acquire(self, key):
+        """Returns the id of key, adding it if needed, and counts a reference."""
+        key_id = self._ids.get(key)
+        if key_id is None:
+            if self._free:
+                key_id = self._free.pop()
+                self._keys[key_id] = key
+            else:
+                key_id = len(self._keys)
+                self._keys.append(key)
+                self._refs.append(0)
+            self._ids[key] = key_id
+        self._refs[key_id] += 1
+        return key_id
+
+    def release(self, key_id):
+        """Drops a reference. Returns True if the id was freed."""
+        self._refs[key_id] -= 1
+        if self._refs[key_id]:
+            return False
+        del self._ids[self._keys[key_id]]
+        self._keys[key_id] = None
+        self._free.append(key_id)
+        return True
+
+
+class _UserPrints(MutableMapping):
+    """Live {print_nr: last_change_date} view of one user's subscriptions."""
+
+    def __init__(self, table, user_id):
+        self._table = table
+        self._user_id = user_id
+
+    def __getitem__(self, print_nr):
+        missing = object()
+        change_date = self._table.get_date(self._user_id, print_nr, missing)
+        if change_date is missing:
+            raise KeyError(print_nr)
+        return change_date
+
+    def __setitem__(self, print_nr, change_date):
+        self._table.set(self._user_id, print_nr, change_date)
+
+    def __delitem__(self, print_nr):
+        if not self._table.discard(self._user_id, print_nr):
+            raise KeyError(print_nr)
+
+    def __iter__(self):
+        return iter(self._table.user_prints(self._user_id))
+
+    def __len__(self):
+        user = self._table._users.id(self._user_id)
+        if user is None:
+            return 0
+        return 1 + len(self._table._user_more_prints.get(user, ()))
+
+    def __repr__(self):
+        return repr(self._table.user_prints(self._user_id))
+
+
+class _PrintSubscribers(Mapping):
+    """Read-only {print_nr: {user_id: last_change_date}} view of a table."""
+
+    def __init__(self, table):
+        self._table = table
+
+    def __getitem__(self, print_nr):
+        table = self._table
+        print_id = table._prints.id(print_nr)
+        if print_id is None:
+            raise KeyError(print_nr)
+        return {
+            table._users.key(user): table._date_key(date)
+            for user, date in table._subscriptions(print_id)
+        }
+
+    def __contains__(self, print_nr):
+        return print_nr in self._table._prints
+
+    def __iter__(self):
+        return iter(list(self._table._prints))
+
+    def __len__(self):
+        return len(self._table._prints)
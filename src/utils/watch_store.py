@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import sqlite3
+
+
+class SqliteWatchStore:
+    """
+    Watch store backed by an SQLite database in WAL mode.
+
+    Every mutation touches a single row, so updating one change date no
+    longer rewrites the whole store. Rows are indexed by user (primary key)
+    and by print number.
+
+    Args:
+        path (str): Path to the database file.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS watched_prints ("
+                " user_id TEXT NOT NULL,"
+                " print_nr TEXT NOT NULL,"
+                " change_date TEXT NOT NULL,"
+                " PRIMARY KEY (user_id, print_nr))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_watched_prints_print_nr"
+                " ON watched_prints (print_nr)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_channels ("
+                " channel_id INTEGER NOT NULL,"
+                " guild_id INTEGER,"
+                " source TEXT NOT NULL,"
+                " PRIMARY KEY (channel_id, source))"
+            )
+            columns = {
+                row[1]
+                for row in self._conn.execute("PRAGMA table_info(report_channels)")
+            }
+            if "guild_id" not in columns:
+                # Databases created before report channels kept their guild.
+                self._conn.execute(
+                    "ALTER TABLE report_channels ADD COLUMN guild_id INTEGER"
+                )
+
+    def close(self):
+        """Closes the database connection."""
+        self._conn.close()
+
+    def migrate_from_json(self, json_path):
+        """
+        Imports watched prints from the legacy JSON file.
+
+        Runs only when the database is empty. The JSON file is renamed
+        afterwards so the import happens once.
+
+        Returns:
+            int: The number of imported subscriptions.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM watched_prints").fetchone()
+        if count:
+            return 0
+
+        with open(json_path, "r") as f:
+            data = json.load(f)
+        rows = [
+            (str(user_id), print_nr, change_date)
+            for user_id, prints in data.items()
+            for print_nr, change_date in prints.items()
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO watched_prints VALUES (?, ?, ?)", rows
+            )
+        os.replace(json_path, f"{json_path}.migrated")
+        logging.info(f"Migrated {len(rows)} watched prints from {json_path}")
+        return len(rows)
+
+    def get_all(self):
+        """Returns all watched prints as {user_id: {print_nr: change_date}}."""
+        watched_prints = {}
+        for user_id, print_nr, change_date in self._conn.execute(
+            "SELECT user_id, print_nr, change_date FROM watched_prints"
+        ):
+            watched_prints.setdefault(user_id, {})[print_nr] = change_date
+        return watched_prints
+
+    def get_user(self, user_id):
+        """Returns the prints watched by a user as {print_nr: change_date}."""
+        return dict(
+            self._conn.execute(
+                "SELECT print_nr, change_date FROM watched_prints WHERE user_id = ?",
+                (str(user_id),),
+            )
+        )
+
+    def get_print_subscribers(self):
+        """Returns all watched prints as {print_nr: {user_id: change_date}}."""
+        subscribers = {}
+        for print_nr, user_id, change_date in self._conn.execute(
+            "SELECT print_nr, user_id, change_date FROM watched_prints"
+            " ORDER BY print_nr"
+        ):
+            subscribers.setdefault(print_nr, {})[user_id] = change_date
+        return subscribers
+
+    def add(self, user_id, print_nr, change_date):
+        """Adds or replaces a watched print."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watched_prints VALUES (?, ?, ?)",
+                (str(user_id), print_nr, change_date),
+            )
+        return True
+
+    def remove(self, user_id, print_nr):
+        """Removes a watched print. Returns False if it was not watched."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM watched_prints WHERE user_id = ? AND print_nr = ?",
+                (str(user_id), print_nr),
+            )
+        return cursor.rowcount > 0
+
+    def update_change_date(self, user_id, print_nr, new_date):
+        """Updates the change date of a watched print. Returns False if not watched."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "UPDATE watched_prints SET change_date = ?"
+                " WHERE user_id = ? AND print_nr = ?",
+                (new_date, str(user_id), print_nr),
+            )
+        return cursor.rowcount > 0
+
+    def get_report_channels(self, source):
+        """Returns the report channels from a source as {channel_id: guild_id}."""
+        return dict(
+            self._conn.execute(
+                "SELECT channel_id, guild_id FROM report_channels WHERE source = ?",
+                (source,),
+            )
+        )
+
+    def add_report_channel(self, channel_id, guild_id, source):
+        """Adds a report channel. Returns False if it was already stored."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO report_channels (channel_id, guild_id, source)"
+                " VALUES (?, ?, ?)",
+                (channel_id, guild_id, source),
+            )
+        return cursor.rowcount > 0
+
+    def remove_report_channel(self, channel_id, source=None):
+        """Removes a report channel from one source, or from all of them."""
+        with self._conn:
+            if source is None:
+                cursor = self._conn.execute(
+                    "DELETE FROM report_channels WHERE channel_id = ?", (channel_id,)
+                )
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM report_channels WHERE channel_id = ? AND source = ?",
+                    (channel_id, source),
+                )
+        return cursor.rowcount > 0
+
+    def set_report_channels(self, channels, source, guild_ids=None):
+        """
+        Replaces the report channels of a source with {channel_id: guild_id}.
+
+        With guild_ids only the channels of those guilds are replaced, so
+        shard processes can each rewrite their own guilds concurrently.
+        """
+        with self._conn:
+            if guild_ids is None:
+                self._conn.execute(
+                    "DELETE FROM report_channels WHERE source = ?", (source,)
+                )
+            else:
+                # IS also matches rows stored before guild ids were recorded.
+                self._conn.executemany(
+                    "DELETE FROM report_channels WHERE source = ? AND guild_id IS ?",
+                    [(source, guild_id) for guild_id in guild_ids],
+                )
+            self._conn.executemany(
+                "INSERT INTO report_channels (channel_id, guild_id, source)"
+                " VALUES (?, ?, ?)",
+                [
+                    (channel_id, guild_id, source)
+                    for channel_id, guild_id in channels.items()
+                ],
+            )
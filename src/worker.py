@@ -0,0 +1,90 @@
+import asyncio
+import logging
+
+from src.utils.change_detector import PrintChangeDetector
+from src.utils.file_operations import init_store, close_store
+from src.utils.http_client import create_http_session
+from src.utils.metrics import start_metrics_server, track_outbox
+from src.utils.outbox import Outbox
+from src.utils.print_mirror import PrintMirror
+from src.utils.sejm_api import SejmApi
+from src.config import (
+    WATCH_STORE_BACKEND,
+    PRINT_MIRROR_ENABLED,
+    PRINT_MIRROR_SYNC_MINUTES,
+    PRINT_MIRROR_DB_FILE,
+    OUTBOX_DB_FILE,
+    METRICS_ENABLED,
+    METRICS_HOST,
+    METRICS_WORKER_PORT,
+)
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+async def run_periodically(interval_seconds, job, name):
+    """Runs a job now and then every interval_seconds, logging its errors."""
+    while True:
+        try:
+            await job()
+        except Exception as e:
+            logging.error(f"Error in {name}: {e}", exc_info=True)
+        await asyncio.sleep(interval_seconds)
+
+
+async def run_worker():
+    """
+    Polls the Sejm API for changes in watched prints outside the bot.
+
+    Notifications are written to the outbox database, which the bot
+    process delivers, and the watch store and print mirror are shared
+    with the bot through their SQLite files.
+    """
+    if WATCH_STORE_BACKEND != "sqlite":
+        raise ValueError("The worker requires the sqlite watch store backend")
+    metrics_runner = None
+    if METRICS_ENABLED:
+        metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_WORKER_PORT)
+    init_store()
+    session = create_http_session()
+    mirror = PrintMirror(PRINT_MIRROR_DB_FILE) if PRINT_MIRROR_ENABLED else None
+    outbox = Outbox(OUTBOX_DB_FILE)
+    track_outbox(outbox)
+    api = SejmApi(session, mirror=mirror)
+    detector = PrintChangeDetector(api, outbox)
+
+    jobs = [
+        run_periodically(detector.interval_seconds, detector.run_cycle, "watch cycle")
+    ]
+    if mirror is not None:
+        jobs.append(
+            run_periodically(
+                PRINT_MIRROR_SYNC_MINUTES * 60,
+                lambda: mirror.sync(api),
+                "print mirror sync",
+            )
+        )
+    try:
+        await asyncio.gather(*jobs)
+    finally:
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await session.close()
+        close_store()
+        outbox.close()
+        if mirror is not None:
+            mirror.close()
+
+
+def main():
+    """Entry point of `python -m src.worker`."""
+    try:
+        asyncio.run(run_worker())
+    except KeyboardInterrupt:
+        logging.info("Worker stopped")
+
+
+if __name__ == "__main__":
+    main()
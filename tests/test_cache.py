@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from src.utils.cache import AsyncTTLCache
+
+
+class TestAsyncTTLCache(unittest.IsolatedAsyncioTestCase):
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest unused entry is evicted when the cache is full."""
+        cache = AsyncTTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    @patch("src.utils.cache.time.monotonic")
+    def test_entries_expire(self, mock_monotonic):
+        """Test that entries are dropped once their time-to-live passes."""
+        mock_monotonic.return_value = 100.0
+        cache = AsyncTTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+
+        mock_monotonic.return_value = 159.0
+        self.assertEqual(cache.get("a"), 1)
+        mock_monotonic.return_value = 160.0
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    async def test_get_or_fetch_caches_result(self):
+        """Test that a fetched value is served from the cache afterwards."""
+        cache = AsyncTTLCache(maxsize=10, ttl=60)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return "value"
+
+        self.assertEqual(await cache.get_or_fetch("k", fetch), "value")
+        self.assertEqual(await cache.get_or_fetch("k", fetch), "value")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    async def test_concurrent_misses_are_coalesced(self):
+        """Test that concurrent misses for one key share a single fetch."""
+        cache = AsyncTTLCache(maxsize=10, ttl=60)
+        release = asyncio.Event()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await release.wait()
+            return "value"
+
+        waiters = [
+            asyncio.ensure_future(cache.get_or_fetch("k", fetch)) for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(await asyncio.gather(*waiters), ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    async def test_ttl_callable_can_skip_storing(self):
+        """Test that a zero time-to-live leaves the value out of the cache."""
+        cache = AsyncTTLCache(maxsize=10, ttl=60)
+
+        async def fetch():
+            return (500, None)
+
+        await cache.get_or_fetch("k", fetch, ttl=lambda result: 0)
+
+        self.assertIsNone(cache.get("k"))
+
+    async def test_failed_fetch_is_not_cached(self):
+        """Test that an exception propagates and the next call fetches again."""
+        cache = AsyncTTLCache(maxsize=10, ttl=60)
+
+        async def failing_fetch():
+            raise RuntimeError("boom")
+
+        async def fetch():
+            return "value"
+
+        with self.assertRaises(RuntimeError):
+            await cache.get_or_fetch("k", failing_fetch)
+        self.assertEqual(await cache.get_or_fetch("k", fetch), "value")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,260 @@
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+from src.utils.change_detector import PrintChangeDetector
+
+
+class TestPrintChangeDetector(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.api = MagicMock()
+        self.api.mirror = None
+        self.outbox = MagicMock()
+
+    def test_mirror_strategy_requires_mirror(self):
+        """Test that the mirror strategy is rejected without a mirror."""
+        with self.assertRaises(ValueError):
+            PrintChangeDetector(self.api, self.outbox, strategy="mirror")
+
+    @patch("src.utils.change_detector.update_print_change_date")
+    @patch("src.utils.change_detector.get_print_subscribers")
+    async def test_poll_cycle_queues_changes(
+        self, mock_get_subscribers, mock_update_change_date
+    ):
+        """Test that changed prints are queued before their dates are stored."""
+        mock_get_subscribers.return_value = {
+            "100": {"1": "2024-01-01", "2": "2024-02-01"},
+            "200": {"1": "2024-01-01"},
+        }
+        responses = {
+            "100": (200, {"changeDate": "2024-02-01"}),
+            "200": (304, {"changeDate": "2024-01-01"}),
+        }
+        self.api.fetch_print_if_modified = AsyncMock(side_effect=responses.get)
+        detector = PrintChangeDetector(
+            self.api, self.outbox, strategy="poll", watch_process_stages=False
+        )
+
+        self.assertEqual(await detector.run_cycle(), 1)
+
+        (messages,) = self.outbox.put_many.call_args.args
+        self.assertEqual([m[:2] for m in messages], [("user", "1")])
+        mock_update_change_date.assert_called_once_with("1", "100", "2024-02-01")
+
+    @patch("src.utils.change_detector.update_print_change_date")
+    @patch("src.utils.change_detector.get_print_subscribers")
+    async def test_not_modified_still_compares_stored_date(
+        self, mock_get_subscribers, mock_update_change_date
+    ):
+        """Test that a 304 notifies watchers whose stored date fell behind."""
+        mock_get_subscribers.return_value = {"100": {"1": "2024-01-01"}}
+        self.api.fetch_print_if_modified = AsyncMock(
+            return_value=(304, {"changeDate": "2024-02-01"})
+        )
+        detector = PrintChangeDetector(
+            self.api, self.outbox, strategy="poll", watch_process_stages=False
+        )
+
+        self.assertEqual(await detector.run_cycle(), 1)
+        mock_update_change_date.assert_called_once_with("1", "100", "2024-02-01")
+
+    @patch("src.utils.change_detector.save_watcher_state")
+    @patch("src.utils.change_detector.load_watcher_state")
+    @patch("src.utils.change_detector.update_print_change_date")
+    @patch("src.utils.change_detector.get_print_subscribers")
+    async def test_adaptive_cycle_checks_only_due_prints(
+        self,
+        mock_get_subscribers,
+        mock_update_change_date,
+        mock_load_state,
+        mock_save_state,
+    ):
+        """Test that prints are checked again only once their interval passed."""
+        mock_get_subscribers.return_value = {"100": {"1": "2024-01-01"}}
+        mock_load_state.return_value = {}
+        self.api.fetch_print_if_modified = AsyncMock(
+            return_value=(200, {"changeDate": "2024-02-01"})
+        )
+        detector = PrintChangeDetector(
+            self.api, self.outbox, strategy="adaptive", watch_process_stages=False
+        )
+
+        await detector.run_cycle()
+        await detector.run_cycle()
+
+        self.api.fetch_print_if_modified.assert_awaited_once_with("100")
+        (state,) = mock_save_state.call_args.args
+        self.assertIn("100", state["poll_schedule"])
+        # The second tick has nothing due and touches neither store nor state.
+        mock_get_subscribers.assert_called_once()
+        mock_save_state.assert_called_once()
+
+
+class TestFeedStrategy(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.api = MagicMock()
+        self.api.mirror = None
+        self.feed = [
+            {"number": 5, "changeDate": "2024-03-01"},
+            {"number": 6, "changeDate": "2024-02-15"},
+            {"number": 7, "changeDate": "2024-01-01"},
+        ]
+
+        async def iter_prints(sort_by):
+            for print_item in self.feed:
+                yield print_item
+
+        self.api.iter_prints = iter_prints
+        self.outbox = MagicMock()
+        self.state = {"feed_high_water_mark": "2024-02-01"}
+        patchers = [
+            patch(
+                "src.utils.change_detector.get_print_subscribers",
+                return_value={
+                    "5": {"1": "2024-01-01"},
+                    "6": {"2": "2024-01-01"},
+                },
+            ),
+            patch("src.utils.change_detector.update_print_change_date"),
+            patch(
+                "src.utils.change_detector.load_watcher_state",
+                side_effect=lambda: dict(self.state),
+            ),
+            patch(
+                "src.utils.change_detector.save_watcher_state",
+                side_effect=self.state.update,
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.detector = PrintChangeDetector(
+            self.api, self.outbox, strategy="feed", watch_process_stages=False
+        )
+
+    async def test_walks_feed_down_to_high_water_mark(self):
+        """Test that only prints changed since the mark are examined and queued."""
+        self.assertEqual(await self.detector.run_cycle(), 2)
+
+        (messages,) = self.outbox.put_many.call_args.args
+        self.assertEqual(sorted(m[1] for m in messages), ["1", "2"])
+        self.assertEqual(self.state["feed_high_water_mark"], "2024-03-01")
+
+    async def test_failed_flush_keeps_high_water_mark(self):
+        """Test that the mark advances only once the notifications are queued."""
+        self.outbox.put_many.side_effect = OSError("disk full")
+
+        with self.assertRaises(OSError):
+            await self.detector.run_cycle()
+
+        self.assertEqual(self.state["feed_high_water_mark"], "2024-02-01")
+        self.outbox.put_many.side_effect = None
+        self.assertEqual(await self.detector.run_cycle(), 2)
+        self.assertEqual(self.state["feed_high_water_mark"], "2024-03-01")
+
+    async def test_failed_walk_keeps_high_water_mark(self):
+        """Test that an error walking the feed leaves the mark for the next cycle."""
+
+        async def iter_prints(sort_by):
+            yield self.feed[0]
+            raise OSError("connection reset")
+
+        self.api.iter_prints = iter_prints
+
+        await self.detector.run_cycle()
+
+        self.assertEqual(self.state["feed_high_water_mark"], "2024-02-01")
+
+
+class TestProcessStageWatching(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.api = MagicMock()
+        self.api.mirror = None
+        self.api.fetch_print_if_modified = AsyncMock(
+            return_value=(304, {"changeDate": "2024-01-01"})
+        )
+        # Prints 100 and 101 belong to process 100.
+        self.api.fetch_print = AsyncMock(
+            side_effect=lambda nr: (200, {"number": nr, "processPrint": ["100"]})
+        )
+        self.process = {"passed": False, "stages": [{"stageName": "I czytanie"}]}
+
+        async def fetch_process(process_nr):
+            return 200, self.process
+
+        self.api.fetch_process = AsyncMock(side_effect=fetch_process)
+        self.outbox = MagicMock()
+        self.state = {}
+        patchers = [
+            patch(
+                "src.utils.change_detector.get_print_subscribers",
+                return_value={
+                    "100": {"1": "2024-01-01"},
+                    "101": {"2": "2024-01-01"},
+                },
+            ),
+            patch("src.utils.change_detector.update_print_change_date"),
+            patch(
+                "src.utils.change_detector.load_watcher_state",
+                side_effect=lambda: dict(self.state),
+            ),
+            patch(
+                "src.utils.change_detector.save_watcher_state",
+                side_effect=self.state.update,
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.detector = PrintChangeDetector(self.api, self.outbox, strategy="poll")
+
+    async def run_cycle(self):
+        # Make the process check due again.
+        self.state["process_checked_at"] = 0
+        self.detector._process_checked_at = 0
+        return await self.detector.run_cycle()
+
+    async def test_shared_process_fetched_once(self):
+        """Test that prints of the same process cause a single process fetch."""
+        await self.run_cycle()
+
+        self.api.fetch_process.assert_awaited_once_with("100")
+
+    async def test_first_snapshot_is_baseline(self):
+        """Test that the first look at a process notifies nobody."""
+        self.assertEqual(await self.run_cycle(), 0)
+        self.assertEqual(self.state["process_snapshots"]["100"][1], "I czytanie")
+
+    async def test_stage_transition_notifies_watchers(self):
+        """Test that a new stage is reported to the watchers of all its prints."""
+        await self.run_cycle()
+        self.process = {
+            "passed": False,
+            "stages": [{"stageName": "I czytanie"}, {"stageName": "II czytanie"}],
+        }
+
+        self.assertEqual(await self.run_cycle(), 2)
+
+        (messages,) = self.outbox.put_many.call_args.args
+        self.assertEqual(sorted(m[1] for m in messages), ["1", "2"])
+        self.assertIn("II czytanie", messages[0][2])
+        # Print to process mapping is remembered between cycles.
+        self.assertEqual(self.api.fetch_print.await_count, 2)
+
+    async def test_unchanged_process_notifies_nobody(self):
+        """Test that a process with an unchanged snapshot queues nothing."""
+        await self.run_cycle()
+
+        self.assertEqual(await self.run_cycle(), 0)
+
+    async def test_check_waits_for_interval(self):
+        """Test that processes are not fetched again before the interval passes."""
+        await self.detector.run_cycle()
+        await self.detector.run_cycle()
+
+        self.api.fetch_process.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
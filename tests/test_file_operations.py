@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch, mock_open, MagicMock
 import json
 import os
+import tempfile
 from src.utils import file_operations
 
 # Mock file path
@@ -235,6 +236,141 @@ class TestFileOperations(unittest.TestCase):
             file_operations.watched_prints, {"2": {"print_n": "2024-02-01"}}
         )
 
+    def test_get_print_subscribers_groups_users_by_print(self):
+        """Test building the print -> subscribers index."""
+        file_operations.watched_prints.update(
+            {
+                "1": {"100": "2024-01-01", "200": "2024-02-01"},
+                "2": {"100": "2024-01-05"},
+            }
+        )
+
+        result = file_operations.get_print_subscribers()
+
+        self.assertEqual(
+            result,
+            {
+                "100": {"1": "2024-01-01", "2": "2024-01-05"},
+                "200": {"1": "2024-02-01"},
+            },
+        )
+
+    def test_get_print_subscribers_empty(self):
+        """Test the subscribers index when nothing is watched."""
+        with patch("src.utils.file_operations.load_watched_prints"):
+            self.assertEqual(file_operations.get_print_subscribers(), {})
+
+
+class TestWriteBehind(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        file_operations.watched_prints.clear()
+        file_operations.enable_write_behind()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "data", "watched_prints.json")
+
+    def tearDown(self):
+        file_operations.enable_write_behind(False)
+        file_operations._dirty = False
+        self.tmp_dir.cleanup()
+
+    @patch("src.utils.file_operations.save_watched_prints")
+    async def test_mutations_only_mark_dirty(self, mock_save_watched_prints):
+        """Test that mutations in write-behind mode do not write the file."""
+        file_operations.add_watched_print(1, "100", "2024-01-01")
+        file_operations.update_print_change_date(1, "100", "2024-02-01")
+
+        mock_save_watched_prints.assert_not_called()
+        self.assertTrue(file_operations._dirty)
+
+    async def test_flush_writes_once_atomically(self):
+        """Test that many mutations result in a single atomic write."""
+        for i in range(100):
+            file_operations.add_watched_print(1, str(i), "2024-01-01")
+
+        with patch("src.utils.file_operations.WATCHED_PRINTS_FILE", self.path), patch(
+            "src.utils.file_operations.os.replace", wraps=os.replace
+        ) as mock_replace:
+            self.assertTrue(await file_operations.flush_watched_prints())
+            self.assertFalse(await file_operations.flush_watched_prints())
+
+        mock_replace.assert_called_once_with(f"{self.path}.tmp", self.path)
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)["1"]), 100)
+        self.assertFalse(os.path.exists(f"{self.path}.tmp"))
+
+    async def test_failed_flush_stays_dirty(self):
+        """Test that a failed write is retried on the next flush."""
+        file_operations.add_watched_print(1, "100", "2024-01-01")
+
+        with patch("src.utils.file_operations._write_atomically", side_effect=OSError):
+            with self.assertRaises(OSError):
+                await file_operations.flush_watched_prints()
+
+        self.assertTrue(file_operations._dirty)
+
+
+class TestWatcherState(unittest.TestCase):
+
+    def test_watcher_state_round_trip(self):
+        """Test saving and loading the watcher state."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "data", "watcher_state.json")
+            with patch("src.utils.file_operations.WATCHER_STATE_FILE", path):
+                self.assertEqual(file_operations.load_watcher_state(), {})
+
+                file_operations.save_watcher_state(
+                    {"feed_high_water_mark": "2024-01-01T10:00:00"}
+                )
+
+                self.assertEqual(
+                    file_operations.load_watcher_state(),
+                    {"feed_high_water_mark": "2024-01-01T10:00:00"},
+                )
+
+
+class TestReportChannels(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp_dir.name, "data", "report_channels.json")
+        patcher = patch("src.utils.file_operations.REPORT_CHANNELS_FILE", path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_report_channels_round_trip(self):
+        """Test that report channels are persisted per source with their guild."""
+        self.assertEqual(file_operations.get_report_channels(), {})
+
+        self.assertTrue(file_operations.add_report_channel(10, 1))
+        self.assertFalse(file_operations.add_report_channel(10, 1))
+        file_operations.set_report_channels({10: 1, 20: 2}, "discovered")
+
+        self.assertEqual(file_operations.get_report_channels("registered"), {10: 1})
+        self.assertEqual(
+            file_operations.get_report_channels("discovered"), {10: 1, 20: 2}
+        )
+
+    def test_set_report_channels_of_some_guilds(self):
+        """Test that replacing the channels of some guilds keeps the others."""
+        file_operations.set_report_channels({10: 1, 20: 2}, "discovered")
+
+        file_operations.set_report_channels({30: 1}, "discovered", guild_ids=[1, 3])
+
+        self.assertEqual(
+            file_operations.get_report_channels("discovered"), {20: 2, 30: 1}
+        )
+
+    def test_remove_report_channel_from_all_sources(self):
+        """Test that removing without a source drops the channel everywhere."""
+        file_operations.add_report_channel(10, 1)
+        file_operations.add_report_channel(10, 1, "discovered")
+
+        self.assertTrue(file_operations.remove_report_channel(10))
+        self.assertFalse(file_operations.remove_report_channel(10))
+        self.assertEqual(file_operations.get_report_channels("discovered"), {})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from src.utils.messages import chunk_lines
+
+
+class TestChunkLines(unittest.TestCase):
+
+    def test_short_lines_fit_in_one_message(self):
+        """Test that lines within the limit produce a single message."""
+        self.assertEqual(
+            list(chunk_lines(["a", "b"], limit=100, header="H\n")), ["H\na\nb\n"]
+        )
+
+    def test_splits_on_line_boundaries(self):
+        """Test that a line that would overflow starts a new message."""
+        parts = list(chunk_lines(["aaaa", "bbbb", "cccc"], limit=10))
+
+        self.assertEqual(parts, ["aaaa\nbbbb\n", "cccc\n"])
+
+    def test_no_part_exceeds_limit(self):
+        """Test that every message respects the limit."""
+        lines = [f"- Druk nr {i}: " + "x" * (i % 50) for i in range(1000)]
+
+        parts = list(chunk_lines(lines, limit=200, header="**Raport**\n\n"))
+
+        self.assertTrue(all(len(part) <= 200 for part in parts))
+        self.assertEqual(
+            "".join(parts), "**Raport**\n\n" + "".join(l + "\n" for l in lines)
+        )
+
+    def test_header_is_not_sent_alone(self):
+        """Test that a long first line fills the message after the header."""
+        parts = list(chunk_lines(["x" * 30], limit=20, header="**Raport**\n"))
+
+        self.assertTrue(all(len(part) <= 20 for part in parts))
+        self.assertEqual(parts[0], "**Raport**\n" + "x" * 8 + "\n")
+        self.assertEqual("".join(parts).replace("\n", ""), "**Raport**" + "x" * 30)
+
+    def test_line_that_fits_a_message_is_kept_whole_after_header(self):
+        """Test that a line too long only next to the header starts a new message."""
+        parts = list(chunk_lines(["x" * 15], limit=20, header="**Raport**\n"))
+
+        self.assertEqual(parts, ["**Raport**\n", "x" * 15 + "\n"])
+
+    def test_oversize_line_is_split_at_whitespace(self):
+        """Test that a line longer than the limit is split between words."""
+        line = " ".join(["słowo"] * 10)
+
+        parts = list(chunk_lines([line], limit=20))
+
+        self.assertTrue(all(len(part) <= 20 for part in parts))
+        self.assertEqual(" ".join(p.strip() for p in parts), line)
+
+    def test_oversize_line_keeps_links_whole(self):
+        """Test that markdown links are not split when avoidable."""
+        line = "intro " + "[Druk nr 1 tytuł](https://example.com/a) koniec"
+
+        parts = list(chunk_lines([line], limit=50))
+
+        self.assertIn("[Druk nr 1 tytuł](https://example.com/a)", "".join(parts))
+        self.assertTrue(all(len(part) <= 50 for part in parts))
+
+    def test_line_without_whitespace_is_hard_split(self):
+        """Test that a line without break opportunities is cut at the limit."""
+        parts = list(chunk_lines(["x" * 25], limit=10))
+
+        self.assertEqual(parts, ["x" * 9 + "\n", "x" * 9 + "\n", "x" * 7 + "\n"])
+
+
+if __name__ == "__main__":
+    unittest.main()
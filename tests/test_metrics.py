@@ -0,0 +1,115 @@
+import socket
+import unittest
+from unittest.mock import MagicMock
+from src.utils.metrics import (
+    Registry,
+    Counter,
+    Histogram,
+    start_metrics_server,
+    track_cache,
+)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_renders_labels(self):
+        """Test that counters are rendered per label set."""
+        counter = Counter(
+            "requests_total", "Requests.", ["status"], registry=self.registry
+        )
+        counter.inc(status=200)
+        counter.inc(2, status=200)
+        counter.inc(status=404)
+
+        output = self.registry.render()
+
+        self.assertIn("# TYPE requests_total counter", output)
+        self.assertIn('requests_total{status="200"} 3', output)
+        self.assertIn('requests_total{status="404"} 1', output)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that histogram buckets count observations up to their bound."""
+        histogram = Histogram(
+            "latency_seconds", "Latency.", buckets=(0.1, 1), registry=self.registry
+        )
+        histogram.observe(0.05)
+        histogram.observe(0.1)
+        histogram.observe(5)
+
+        output = self.registry.render()
+
+        self.assertIn('latency_seconds_bucket{le="0.1"} 2', output)
+        self.assertIn('latency_seconds_bucket{le="1"} 2', output)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3', output)
+        self.assertIn("latency_seconds_count 3", output)
+        self.assertEqual(histogram.count(), 3)
+
+    def test_histogram_time_records_on_error(self):
+        """Test that a timed block is observed even when it raises."""
+        histogram = Histogram("cycle_seconds", "Cycle.", registry=self.registry)
+
+        with self.assertRaises(RuntimeError):
+            with histogram.time():
+                raise RuntimeError
+
+        self.assertEqual(histogram.count(), 1)
+
+    def test_wrong_labels_are_rejected(self):
+        """Test that observing with unexpected labels raises."""
+        counter = Counter("errors_total", "Errors.", ["reason"], registry=self.registry)
+
+        with self.assertRaises(ValueError):
+            counter.inc(status=500)
+
+    def test_cache_collectors_share_one_family(self):
+        """Test that several tracked caches are described only once."""
+        for name, hits in (("api", 3), ("reports", 1)):
+            cache = MagicMock(hits=hits, misses=1)
+            cache.__len__.return_value = 2
+            track_cache(name, cache, registry=self.registry)
+
+        output = self.registry.render()
+
+        self.assertEqual(output.count("# TYPE sejmbot_cache_requests_total"), 1)
+        self.assertIn(
+            'sejmbot_cache_requests_total{cache="api",result="hit"} 3', output
+        )
+        self.assertIn(
+            'sejmbot_cache_requests_total{cache="reports",result="hit"} 1', output
+        )
+
+    def test_tracking_a_cache_again_replaces_it(self):
+        """Test that a re-created cache does not report its series twice."""
+        for hits in (3, 5):
+            cache = MagicMock(hits=hits, misses=1)
+            cache.__len__.return_value = 2
+            track_cache("api", cache, registry=self.registry)
+
+        output = self.registry.render()
+
+        self.assertEqual(output.count('cache="api",result="hit"'), 1)
+        self.assertIn(
+            'sejmbot_cache_requests_total{cache="api",result="hit"} 5', output
+        )
+
+
+class TestMetricsServer(unittest.IsolatedAsyncioTestCase):
+
+    async def test_port_in_use_is_not_fatal(self):
+        """Test that a port that cannot be bound leaves the bot running."""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            sock.listen()
+            port = sock.getsockname()[1]
+
+            with self.assertLogs(level="ERROR"):
+                runner = await start_metrics_server("127.0.0.1", port, Registry())
+
+        self.assertIsNone(runner)
+
+
+if __name__ == "__main__":
+    unittest.main()
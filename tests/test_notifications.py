@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import MagicMock
+from src.utils.notifications import NotificationDispatcher, format_digest
+
+
+class TestFormatDigest(unittest.TestCase):
+
+    def test_single_change(self):
+        """Test that a single change keeps the detailed message format."""
+        (message,) = format_digest([("100", "2024-01-01", "2024-02-01")])
+
+        self.assertIn("**Aktualizacja druku nr 100**", message)
+        self.assertIn("`!druk 100`", message)
+
+    def test_many_changes_form_one_digest(self):
+        """Test that several changes are listed in one message."""
+        changes = [(str(i), "2024-01-01", "2024-02-01") for i in range(5)]
+
+        (message,) = format_digest(changes)
+
+        self.assertIn("(5)", message)
+        self.assertEqual(message.count("- Druk nr"), 5)
+
+    def test_stage_changes_join_the_digest(self):
+        """Test that process stage changes are listed with change date updates."""
+        (message,) = format_digest(
+            [("100", "2024-01-01", "2024-02-01")],
+            [("200", "I czytanie", "II czytanie")],
+        )
+
+        self.assertIn("(2)", message)
+        self.assertIn("etap procesu: I czytanie → II czytanie", message)
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.outbox = MagicMock()
+        self.dispatcher = NotificationDispatcher(self.outbox)
+
+    def test_one_digest_per_user(self):
+        """Test that all changes for a user are queued as one digest."""
+        self.dispatcher.queue(1, "100", "a", "b")
+        self.dispatcher.queue(1, "200", "c", "d")
+        self.dispatcher.queue(2, "100", "a", "b")
+
+        settled = self.dispatcher.flush()
+
+        (messages,) = self.outbox.put_many.call_args.args
+        self.assertEqual([m[:2] for m in messages], [("user", "1"), ("user", "2")])
+        self.assertEqual(
+            sorted(settled), [("1", "100", "b"), ("1", "200", "d"), ("2", "100", "b")]
+        )
+
+    def test_newer_change_replaces_older(self):
+        """Test that a print queued twice is reported once with the latest date."""
+        self.dispatcher.queue(1, "100", "a", "b")
+        self.dispatcher.queue(1, "100", "a", "c")
+
+        self.assertEqual(self.dispatcher.flush(), [("1", "100", "c")])
+
+    def test_flush_clears_pending(self):
+        """Test that queued notifications are handed over only once."""
+        self.dispatcher.queue(1, "100", "a", "b")
+        self.dispatcher.flush()
+
+        self.assertEqual(self.dispatcher.flush(), [])
+
+    def test_failed_enqueue_keeps_nothing_settled(self):
+        """Test that change dates are not settled when the outbox write fails."""
+        self.outbox.put_many.side_effect = OSError("disk full")
+        self.dispatcher.queue(1, "100", "a", "b")
+
+        with self.assertRaises(OSError):
+            self.dispatcher.flush()
+
+
+if __name__ == "__main__":
+    unittest.main()
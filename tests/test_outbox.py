@@ -0,0 +1,181 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+import discord
+from src.utils.outbox import Outbox, OutboxSender
+
+
+def make_http_exception(status, exception_type=discord.HTTPException):
+    response = MagicMock()
+    response.status = status
+    return exception_type(response, "error")
+
+
+class TestOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.outbox = Outbox(os.path.join(self.tmp_dir.name, "outbox.sqlite3"))
+
+    def tearDown(self):
+        self.outbox.close()
+        self.tmp_dir.cleanup()
+
+    def test_messages_for_a_target_are_ordered(self):
+        """Test that only the oldest message of each target is due."""
+        self.outbox.put_many(
+            [
+                ("user", 1, "first", None),
+                ("user", 1, "second", None),
+                ("channel", 2, "report", None),
+            ]
+        )
+
+        due = self.outbox.due_messages(10)
+        self.assertEqual([m.content for m in due], ["first", "report"])
+
+        self.outbox.mark_sent(due[0].id)
+        due = self.outbox.due_messages(10)
+        self.assertEqual([m.content for m in due], ["second", "report"])
+
+    def test_retry_later_backs_off(self):
+        """Test that a failed message is not due until its backoff passes."""
+        self.outbox.put("user", 1, "hello", None)
+        (message,) = self.outbox.due_messages(10)
+
+        self.assertTrue(self.outbox.retry_later(message.id, "error"))
+
+        self.assertEqual(self.outbox.due_messages(10), [])
+        self.assertEqual(self.outbox.pending_count(), 1)
+        with patch("src.utils.outbox.time.time", return_value=time.time() + 3600):
+            (retried,) = self.outbox.due_messages(10)
+        self.assertEqual(retried.attempts, 1)
+
+    @patch("src.utils.outbox.OUTBOX_MAX_ATTEMPTS", 2)
+    def test_message_dies_after_max_attempts(self):
+        """Test that a message is dropped after running out of attempts."""
+        self.outbox.put("user", 1, "hello", None)
+        (message,) = self.outbox.due_messages(10)
+
+        self.assertTrue(self.outbox.retry_later(message.id, "error", delay=0))
+        self.assertFalse(self.outbox.retry_later(message.id, "error", delay=0))
+
+        self.assertEqual(self.outbox.pending_count(), 0)
+
+    def test_due_messages_for_own_shards(self):
+        """Test that a shard process only gets messages for its own shards."""
+        self.outbox.put("channel", 10, "report", partition_key=0 << 22)
+        self.outbox.put("channel", 11, "report", partition_key=1 << 22)
+        self.outbox.put("user", 2 << 22, "digest")
+
+        due = self.outbox.due_messages(10, shard_ids=[1, 2], shard_count=4)
+
+        self.assertEqual([m.target_id for m in due], ["11", str(2 << 22)])
+
+    def test_messages_survive_reopening(self):
+        """Test that queued messages are kept across restarts."""
+        self.outbox.put("channel", 5, "report", None)
+        self.outbox.close()
+
+        self.outbox = Outbox(os.path.join(self.tmp_dir.name, "outbox.sqlite3"))
+
+        (message,) = self.outbox.due_messages(10)
+        self.assertEqual(message.target_id, "5")
+
+
+class TestOutboxSender(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.outbox = Outbox(os.path.join(self.tmp_dir.name, "outbox.sqlite3"))
+        self.user = MagicMock()
+        self.user.send = AsyncMock()
+        self.bot = MagicMock()
+        self.bot.get_user.return_value = self.user
+        self.bot.fetch_user = AsyncMock(return_value=self.user)
+        self.sender = OutboxSender(self.bot, self.outbox)
+
+    def tearDown(self):
+        self.outbox.close()
+        self.tmp_dir.cleanup()
+
+    async def test_sends_due_messages(self):
+        """Test that a delivered message is removed from the outbox."""
+        self.outbox.put("user", 1, "hello", None)
+
+        self.assertEqual(await self.sender.send_due(), 1)
+
+        self.user.send.assert_awaited_once_with("hello")
+        self.assertEqual(self.outbox.pending_count(), 0)
+
+    async def test_falls_back_to_fetch_user(self):
+        """Test that users missing from the cache are fetched."""
+        self.bot.get_user.return_value = None
+        self.outbox.put("user", 1, "hello", None)
+
+        await self.sender.send_due()
+
+        self.bot.fetch_user.assert_awaited_once_with(1)
+        self.user.send.assert_awaited_once()
+
+    async def test_forbidden_is_not_retried(self):
+        """Test that users with DMs disabled do not block the queue."""
+        self.user.send.side_effect = make_http_exception(403, discord.Forbidden)
+        self.outbox.put("user", 1, "hello", None)
+
+        await self.sender.send_due()
+
+        self.assertEqual(self.outbox.pending_count(), 0)
+
+    async def test_rate_limited_send_is_retried(self):
+        """Test that a 429 response keeps the message for a later attempt."""
+        self.user.send.side_effect = make_http_exception(429)
+        self.outbox.put("user", 1, "hello", None)
+
+        await self.sender.send_due()
+
+        self.assertEqual(self.outbox.pending_count(), 1)
+        self.assertEqual(self.outbox.due_messages(10), [])
+
+    async def test_one_send_in_flight_per_target(self):
+        """Test that sends run concurrently across targets but not within one."""
+        release = asyncio.Event()
+
+        async def send(content):
+            await release.wait()
+
+        self.user.send.side_effect = send
+        self.outbox.put_many(
+            [
+                ("user", 1, "first", None),
+                ("user", 1, "second", None),
+                ("user", 2, "other", None),
+            ]
+        )
+
+        self.assertEqual(self.sender._start_due(), 2)
+        self.assertEqual(self.sender._start_due(), 0)
+        await asyncio.sleep(0)
+        sent = {call.args[0] for call in self.user.send.call_args_list}
+        self.assertEqual(sent, {"first", "other"})
+
+        release.set()
+        await self.sender.send_due()
+        await self.sender.send_due()
+        self.assertEqual(self.outbox.pending_count(), 0)
+
+    @patch("src.utils.outbox.OUTBOX_WORKERS", 1)
+    async def test_worker_pool_is_bounded(self):
+        """Test that no more than OUTBOX_WORKERS sends are started."""
+        self.outbox.put_many([("user", 1, "a", None), ("user", 2, "b", None)])
+
+        self.assertEqual(await self.sender.send_due(), 1)
+        self.assertEqual(await self.sender.send_due(), 1)
+        self.assertEqual(self.outbox.pending_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from src.utils.poll_schedule import PollSchedule
+
+HOUR = 3600
+
+
+class TestPollSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self.schedule = PollSchedule(
+            min_interval=HOUR,
+            max_interval=8 * HOUR,
+            dormant_max_interval=64 * HOUR,
+            dormant_after=30 * 24 * HOUR,
+        )
+
+    def test_new_prints_are_due_immediately(self):
+        """Test that newly watched prints are checked on the next tick."""
+        self.schedule.sync({"1", "2"}, now=0)
+
+        self.assertEqual(sorted(self.schedule.pop_due(0)), ["1", "2"])
+        self.assertEqual(self.schedule.pop_due(0), [])
+
+    def test_unchanged_prints_back_off(self):
+        """Test that the interval doubles up to the maximum."""
+        self.schedule.sync({"1"}, now=0)
+        now = 0
+        intervals = []
+        for _ in range(6):
+            (print_nr,) = self.schedule.pop_due(now)
+            self.schedule.reschedule(print_nr, now, changed=False)
+            next_check = self.schedule.next_check()
+            intervals.append((next_check - now) // HOUR)
+            now = next_check
+
+        self.assertEqual(intervals, [2, 4, 8, 8, 8, 8])
+
+    def test_change_resets_interval(self):
+        """Test that a changed print is checked again after the minimum interval."""
+        self.schedule.load_state({"1": [0, 8 * HOUR]})
+
+        self.schedule.pop_due(0)
+        self.schedule.reschedule("1", 0, changed=True)
+
+        self.assertEqual(self.schedule.next_check(), HOUR)
+
+    def test_dormant_and_concluded_prints_back_off_further(self):
+        """Test that dormant and concluded prints may exceed the maximum."""
+        self.schedule.load_state({"1": [0, 8 * HOUR], "2": [0, 8 * HOUR]})
+        now = 365 * 24 * HOUR
+
+        self.schedule.reschedule("1", now, False, last_change_date="1970-01-02")
+        self.schedule.reschedule("2", now, False, concluded=True)
+
+        self.assertEqual(self.schedule.to_state()["1"], [now + 16 * HOUR, 16 * HOUR])
+        self.assertEqual(self.schedule.to_state()["2"], [now + 16 * HOUR, 16 * HOUR])
+
+    def test_failed_check_keeps_interval(self):
+        """Test that a failed check is retried without backing off."""
+        self.schedule.load_state({"1": [0, 4 * HOUR]})
+
+        self.schedule.reschedule("1", 0, changed=None)
+
+        self.assertEqual(self.schedule.to_state()["1"], [4 * HOUR, 4 * HOUR])
+
+    def test_unwatched_prints_are_dropped(self):
+        """Test that prints nobody watches are no longer checked."""
+        self.assertTrue(self.schedule.sync({"1", "2"}, now=0))
+        self.assertTrue(self.schedule.sync({"2"}, now=0))
+        self.assertFalse(self.schedule.sync({"2"}, now=0))
+
+        self.assertEqual(self.schedule.pop_due(0), ["2"])
+        self.assertNotIn("1", self.schedule)
+
+    def test_state_round_trip(self):
+        """Test that a saved schedule is restored with its heap order."""
+        self.schedule.load_state({"1": [50, HOUR], "2": [10, HOUR]})
+        restored = PollSchedule(HOUR, 8 * HOUR, 64 * HOUR, HOUR)
+        restored.load_state(self.schedule.to_state())
+
+        self.assertEqual(restored.next_check(), 10)
+        self.assertEqual(restored.pop_due(100), ["2", "1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+from src.utils.print_mirror import PrintMirror
+from src.utils.sejm_api import SejmApi
+
+
+class FakeApi:
+    """Stand-in for SejmApi.iter_prints serving a fixed list."""
+
+    def __init__(self, prints):
+        self.prints = prints
+        self.consumed = 0
+
+    async def iter_prints(self, sort_by):
+        for print_item in sorted(
+            self.prints, key=lambda item: item["changeDate"], reverse=True
+        ):
+            self.consumed += 1
+            yield print_item
+
+
+def make_print(number, delivery_date, change_date):
+    return {
+        "number": number,
+        "title": f"Druk {number}",
+        "deliveryDate": delivery_date,
+        "changeDate": change_date,
+    }
+
+
+class TestPrintMirror(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mirror = PrintMirror(os.path.join(self.tmp_dir.name, "mirror.sqlite3"))
+
+    def tearDown(self):
+        self.mirror.close()
+        self.tmp_dir.cleanup()
+
+    async def test_full_then_incremental_sync(self):
+        """Test that a second sync only walks prints changed since the first."""
+        api = FakeApi(
+            [
+                make_print("1", "2024-01-01", "2024-01-01T10:00:00"),
+                make_print("2", "2024-01-02", "2024-01-02T10:00:00"),
+            ]
+        )
+
+        self.assertFalse(self.mirror.is_ready)
+        self.assertEqual(await self.mirror.sync(api), 2)
+        self.assertTrue(self.mirror.is_ready)
+
+        api.prints.append(make_print("3", "2024-01-03", "2024-01-03T10:00:00"))
+        api.consumed = 0
+        await self.mirror.sync(api)
+
+        # The new print, the boundary print and the first older one are read.
+        self.assertEqual(api.consumed, 3)
+        self.assertEqual(self.mirror.synced_through, "2024-01-03T10:00:00")
+        self.assertEqual(self.mirror.get_print("3")["title"], "Druk 3")
+        self.assertEqual(
+            self.mirror.get_change_dates(),
+            {
+                "1": "2024-01-01T10:00:00",
+                "2": "2024-01-02T10:00:00",
+                "3": "2024-01-03T10:00:00",
+            },
+        )
+
+    async def test_recent_prints(self):
+        """Test reading prints delivered since a cutoff date, newest first."""
+        self.mirror.upsert_prints(
+            [
+                make_print("1", "2024-01-01", "2024-01-01T10:00:00"),
+                make_print("2", "2024-01-05", "2024-01-05T10:00:00"),
+                make_print("3", "2024-01-03", "2024-01-03T10:00:00"),
+            ]
+        )
+
+        numbers = [item["number"] for item in self.mirror.recent_prints("2024-01-02")]
+
+        self.assertEqual(numbers, ["2", "3"])
+
+    async def test_api_reads_prints_from_mirror(self):
+        """Test that SejmApi answers from the mirror without a request."""
+        self.mirror.upsert_prints(
+            [make_print("1", "2024-01-01", "2024-01-01T10:00:00")]
+        )
+        session = MagicMock()
+        api = SejmApi(session, mirror=self.mirror)
+
+        status, data = await api.fetch_print("1")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(data["number"], "1")
+        session.get.assert_not_called()
+
+    async def test_api_falls_back_to_mirrored_process(self):
+        """Test that a stored process is served when the API fails."""
+        self.mirror.store_process("1", {"number": "1", "passed": True})
+        api = SejmApi(MagicMock(), mirror=self.mirror)
+        api.get_json = AsyncMock(return_value=(503, None))
+
+        self.assertEqual(
+            await api.fetch_process("1"), (200, {"number": "1", "passed": True})
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+from src.cogs.prints_info import PrintsInfo
+
+PROCESS = {"title": "Proces", "stages": [{"stageName": "I czytanie"}]}
+
+
+class FakeApi:
+    """API whose print and process lookups can be delayed or made to fail."""
+
+    def __init__(self, print_data, processes, delays=None, errors=None):
+        self.print_data = print_data
+        self.processes = processes
+        self.delays = delays or {}
+        self.errors = errors or {}
+        self.events = []
+        self.cancelled = []
+
+    async def fetch_print(self, nr):
+        self.events.append(("print", nr))
+        await asyncio.sleep(self.delays.get(("print", nr), 0))
+        self.events.append(("print loaded", nr))
+        if ("print", nr) in self.errors:
+            raise self.errors[("print", nr)]
+        if self.print_data is None:
+            return 404, None
+        return 200, self.print_data
+
+    async def fetch_process(self, nr):
+        self.events.append(("process", nr))
+        try:
+            await asyncio.sleep(self.delays.get(("process", nr), 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(nr)
+            raise
+        if ("process", nr) in self.errors:
+            raise self.errors[("process", nr)]
+        if nr not in self.processes:
+            return 404, None
+        return 200, self.processes[nr]
+
+
+class TestFetchPrintAndProcess(unittest.IsolatedAsyncioTestCase):
+
+    def make_cog(self, api):
+        return PrintsInfo(MagicMock(), api)
+
+    async def test_process_is_fetched_while_print_loads(self):
+        """Test that the process lookup starts before the print arrives."""
+        api = FakeApi(
+            {"number": "100"}, {"100": PROCESS}, delays={("print", "100"): 0.05}
+        )
+
+        status, data, process = await self.make_cog(api)._fetch_print_and_process("100")
+
+        self.assertEqual((status, data, process), (200, {"number": "100"}, PROCESS))
+        self.assertEqual(
+            api.events,
+            [("print", "100"), ("process", "100"), ("print loaded", "100")],
+        )
+
+    async def test_failed_process_lookup_uses_fallback(self):
+        """Test that a failing lookup by print number falls back to processPrint."""
+        api = FakeApi(
+            {"number": "101", "processPrint": ["100"]},
+            {"100": PROCESS},
+            errors={("process", "101"): RuntimeError("boom")},
+        )
+
+        _, _, process = await self.make_cog(api)._fetch_print_and_process("101")
+
+        self.assertEqual(process, PROCESS)
+
+    async def test_unused_fallback_is_cancelled(self):
+        """Test that the fallback lookup is cancelled once the direct one succeeds."""
+        api = FakeApi(
+            {"number": "101", "processPrint": ["100"]},
+            {"101": PROCESS, "100": {"title": "Inny"}},
+            delays={("process", "100"): 10},
+        )
+
+        _, _, process = await self.make_cog(api)._fetch_print_and_process("101")
+        await asyncio.sleep(0)
+
+        self.assertEqual(process, PROCESS)
+        self.assertEqual(api.cancelled, ["100"])
+
+    async def test_process_lookup_is_cancelled_when_print_is_missing(self):
+        """Test that the process lookup is cancelled if the print is not found."""
+        api = FakeApi(None, {"100": PROCESS}, delays={("process", "100"): 10})
+
+        status, data, process = await self.make_cog(api)._fetch_print_and_process("100")
+        await asyncio.sleep(0)
+
+        self.assertEqual((status, data, process), (404, None, None))
+        self.assertEqual(api.cancelled, ["100"])
+
+    async def test_process_lookup_is_cancelled_when_print_fails(self):
+        """Test that an error fetching the print cancels the process lookup."""
+        api = FakeApi(
+            None,
+            {"100": PROCESS},
+            delays={("process", "100"): 10},
+            errors={("print", "100"): RuntimeError("boom")},
+        )
+
+        with self.assertRaises(RuntimeError):
+            await self.make_cog(api)._fetch_print_and_process("100")
+        await asyncio.sleep(0)
+
+        self.assertEqual(api.cancelled, ["100"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import patch, AsyncMock
+from src.utils.rate_limit import RateLimiter, HostRateLimiter, KeyedRateLimiter
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+
+    @patch("src.utils.rate_limit.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.utils.rate_limit.time.monotonic", return_value=100.0)
+    async def test_burst_is_not_delayed(self, mock_monotonic, mock_sleep):
+        """Test that requests within the burst start immediately."""
+        limiter = RateLimiter(rate=5, burst=3)
+
+        for _ in range(3):
+            await limiter.acquire()
+
+        mock_sleep.assert_not_called()
+
+    @patch("src.utils.rate_limit.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.utils.rate_limit.time.monotonic", return_value=100.0)
+    async def test_waits_once_burst_is_used(self, mock_monotonic, mock_sleep):
+        """Test that a request beyond the burst waits for the next token."""
+        limiter = RateLimiter(rate=4, burst=1)
+
+        await limiter.acquire()
+        await limiter.acquire()
+
+        mock_sleep.assert_awaited_once_with(0.25)
+
+    @patch("src.utils.rate_limit.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.utils.rate_limit.time.monotonic", return_value=100.0)
+    async def test_hosts_are_limited_separately(self, mock_monotonic, mock_sleep):
+        """Test that each host gets its own bucket."""
+        limiter = HostRateLimiter(rate=1, burst=1)
+
+        await limiter.acquire("https://api.sejm.gov.pl/sejm/term10/prints/1")
+        await limiter.acquire("https://example.com/prints/1")
+
+        mock_sleep.assert_not_called()
+
+    @patch("src.utils.rate_limit.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.utils.rate_limit.time.monotonic", return_value=100.0)
+    async def test_idle_keys_are_pruned(self, mock_monotonic, mock_sleep):
+        """Test that refilled limiters are dropped once max_keys is reached."""
+        limiter = KeyedRateLimiter(rate=1, burst=1, max_keys=2)
+        await limiter.acquire("a")
+        await limiter.acquire("b")
+
+        mock_monotonic.return_value = 110.0
+        await limiter.acquire("c")
+
+        self.assertEqual(list(limiter._limiters), ["c"])
+        mock_sleep.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
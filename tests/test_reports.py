@@ -0,0 +1,124 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+from src.cogs.reports import Reports
+
+
+class FakeApi:
+    """API serving a fixed print list, newest first for either sort order."""
+
+    def __init__(self, prints, mirror=None):
+        self.prints = prints
+        self.mirror = mirror
+        self.requests = []
+        self.fail = False
+
+    async def iter_prints(self, sort_by, page_size=None):
+        self.requests.append(sort_by)
+        if self.fail:
+            raise OSError("connection reset")
+        field = sort_by.lstrip("-")
+        for print_item in sorted(self.prints, key=lambda p: p[field], reverse=True):
+            yield print_item
+
+
+class TestReportCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        today = datetime.date.today().isoformat()
+        self.api = FakeApi(
+            [
+                {
+                    "number": "100",
+                    "title": "Projekt ustawy",
+                    "deliveryDate": today,
+                    "changeDate": f"{today}T10:00:00",
+                }
+            ]
+        )
+        patcher = patch("src.cogs.reports.get_report_channels", return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cog = Reports(MagicMock(), self.api, MagicMock())
+
+    def report_fetches(self):
+        return self.api.requests.count("-deliveryDate")
+
+    def touch(self, change_date="2099-01-01T00:00:00"):
+        self.api.prints[0]["changeDate"] = change_date
+
+    async def test_unchanged_data_version_reuses_report(self):
+        """Test that a report is built once while the newest change date stays."""
+        first = await self.cog._generate_report(7)
+        second = await self.cog._generate_report(7)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.report_fetches(), 1)
+        # Each request still checks the data version with a one-print page.
+        self.assertEqual(self.api.requests.count("-changeDate"), 2)
+
+    async def test_newer_change_date_rebuilds_report(self):
+        """Test that a changed print makes the next request fetch the prints again."""
+        await self.cog._generate_report(7)
+        self.touch()
+
+        await self.cog._generate_report(7)
+
+        self.assertEqual(self.report_fetches(), 2)
+
+    async def test_mirror_sync_rebuilds_report(self):
+        """Test that with a ready mirror the version is its synced_through."""
+        mirror = MagicMock(is_ready=True, synced_through="2024-01-01T00:00:00")
+        mirror.recent_prints.return_value = self.api.prints
+        self.api.mirror = mirror
+
+        await self.cog._generate_report(7)
+        await self.cog._generate_report(7)
+        self.assertEqual(mirror.recent_prints.call_count, 1)
+
+        mirror.synced_through = "2024-01-02T00:00:00"
+        await self.cog._generate_report(7)
+
+        self.assertEqual(mirror.recent_prints.call_count, 2)
+        self.assertEqual(self.api.requests, [])
+
+    async def test_failed_version_check_uses_last_version(self):
+        """Test that a failing version check falls back to the last version seen."""
+        first = await self.cog._generate_report(7)
+        self.api.fail = True
+
+        with self.assertLogs(level="ERROR"):
+            key = await self.cog._report_cache_key(7)
+
+        self.assertEqual(key[2], self.api.prints[0]["changeDate"])
+        self.assertIs(self.cog._fresh_reports.get(key), first)
+
+    async def test_prerender_reuses_rendered_parts(self):
+        """Test that pre-rendering fetches again but renders only changed data."""
+        first = await self.cog._generate_report(7)
+
+        with patch.object(
+            self.cog, "_render_report", wraps=self.cog._render_report
+        ) as render:
+            prerendered = await self.cog.prerender_report(7)
+            self.assertEqual(self.report_fetches(), 2)
+            render.assert_not_called()
+
+            self.api.prints[0]["title"] = "Nowy tytuł"
+            self.touch()
+            await self.cog.prerender_report(7)
+            render.assert_called_once()
+
+        self.assertIs(prerendered, first)
+
+    async def test_weekly_report_uses_prerendered_report(self):
+        """Test that sending after a pre-render fetches no prints."""
+        await self.cog.prerender_report(7)
+
+        await self.cog.send_weekly_report()
+
+        self.assertEqual(self.report_fetches(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from src.utils.search_index import SearchIndex, fold_diacritics, tokenize
+
+
+class TestTokenize(unittest.TestCase):
+
+    def test_fold_diacritics(self):
+        """Test that Polish letters are folded to ASCII."""
+        self.assertEqual(fold_diacritics("Zażółć GĘŚLĄ jaźń"), "zazolc gesla jazn")
+
+    def test_inflected_forms_share_terms(self):
+        """Test that common inflected forms produce the same terms."""
+        self.assertEqual(tokenize("ustawa o podatku"), tokenize("ustawy podatek"))
+        self.assertEqual(tokenize("zmiana"), tokenize("zmianie"))
+
+    def test_stopwords_and_short_tokens_are_dropped(self):
+        """Test that stopwords and one-letter tokens are ignored."""
+        self.assertEqual(tokenize("o i w z"), [])
+
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.add_prints(
+            [
+                {
+                    "number": "100",
+                    "title": "Rządowy projekt ustawy o zmianie ustawy o podatku dochodowym",
+                    "deliveryDate": "2024-01-10",
+                },
+                {
+                    "number": "200",
+                    "title": "Poselski projekt ustawy o ochronie zdrowia",
+                    "deliveryDate": "2024-02-10",
+                },
+                {
+                    "number": "300",
+                    "title": "Sprawozdanie komisji o rządowym projekcie ustawy o podatkach",
+                    "deliveryDate": "2024-03-10",
+                },
+            ]
+        )
+
+    def test_search_without_diacritics(self):
+        """Test that queries match regardless of diacritics and inflection."""
+        self.assertEqual(self.index.search("zdrowie"), ["200"])
+        self.assertEqual(self.index.search("rzadowy podatek"), ["300", "100"])
+
+    def test_prints_matching_more_terms_rank_first(self):
+        """Test that coverage of query terms dominates the ranking."""
+        self.assertEqual(self.index.search("podatek dochodowy")[0], "100")
+
+    def test_readding_replaces_entry(self):
+        """Test that re-indexing a print replaces its old terms."""
+        self.index.add("200", "Projekt uchwały w sprawie rolnictwa", "2024-02-10")
+
+        self.assertEqual(self.index.search("zdrowia"), [])
+        self.assertEqual(self.index.search("rolnictwo"), ["200"])
+        self.assertEqual(len(self.index), 3)
+
+    def test_remove(self):
+        """Test removing a print from the index."""
+        self.index.remove("100")
+
+        self.assertNotIn("100", self.index)
+        self.assertEqual(self.index.search("dochodowy"), [])
+
+    def test_newest_delivery_date(self):
+        """Test that the newest indexed delivery date is tracked."""
+        self.assertEqual(self.index.newest_delivery_date, "2024-03-10")
+
+    def test_empty_query(self):
+        """Test that a query without terms returns no results."""
+        self.assertEqual(self.index.search("o i w"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+from src.utils.sejm_api import SejmApi, SejmApiError
+from src.config import PRINTS_ENDPOINT
+
+
+def make_response(status, data=None, headers=None):
+    """Builds a mock aiohttp response usable as an async context manager."""
+    response = MagicMock()
+    response.status = status
+    response.headers = headers or {}
+    response.json = AsyncMock(return_value=data)
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=False)
+    return context
+
+
+class TestSejmApi(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.api = SejmApi(self.session)
+
+    async def test_fetch_print_is_cached(self):
+        """Test that a print is requested once and then served from the cache."""
+        self.session.get.return_value = make_response(200, {"number": "1"})
+
+        first = await self.api.fetch_print("1")
+        second = await self.api.fetch_print("1")
+
+        self.assertEqual(first, (200, {"number": "1"}))
+        self.assertEqual(second, first)
+        self.session.get.assert_called_once_with(f"{PRINTS_ENDPOINT}/1")
+
+    async def test_server_errors_are_not_cached(self):
+        """Test that a failed request is retried on the next call."""
+        self.session.get.side_effect = [
+            make_response(503),
+            make_response(200, {"number": "1"}),
+        ]
+
+        self.assertEqual(await self.api.fetch_print("1"), (503, None))
+        self.assertEqual(await self.api.fetch_print("1"), (200, {"number": "1"}))
+
+    async def test_conditional_request_sends_validators(self):
+        """Test that validators from the last response are sent back."""
+        self.session.get.side_effect = [
+            make_response(
+                200,
+                {"changeDate": "2024-01-01"},
+                {"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+            ),
+            make_response(304),
+        ]
+
+        first = await self.api.fetch_print_if_modified("1")
+        self.api.cache.clear()
+        second = await self.api.fetch_print_if_modified("1")
+
+        self.assertEqual(first, (200, {"changeDate": "2024-01-01"}))
+        self.assertEqual(second, (304, {"changeDate": "2024-01-01"}))
+        self.assertEqual(
+            self.session.get.call_args.kwargs["headers"],
+            {
+                "If-None-Match": '"abc"',
+                "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+            },
+        )
+
+    async def test_conditional_request_without_validators(self):
+        """Test that no conditional headers are sent when none were received."""
+        self.session.get.return_value = make_response(200, {"changeDate": "d"})
+
+        await self.api.fetch_print_if_modified("1")
+
+        self.assertEqual(self.session.get.call_args.kwargs["headers"], {})
+
+    async def test_iter_prints_requests_pages_lazily(self):
+        """Test that pages are requested only while the caller consumes them."""
+        self.session.get.side_effect = [
+            make_response(200, [{"number": "3"}, {"number": "2"}]),
+            make_response(200, [{"number": "1"}, {"number": "0"}]),
+        ]
+
+        numbers = []
+        async for print_item in self.api.iter_prints("-deliveryDate", page_size=2):
+            numbers.append(print_item["number"])
+            if print_item["number"] == "2":
+                break
+
+        self.assertEqual(numbers, ["3", "2"])
+        self.session.get.assert_called_once_with(
+            f"{PRINTS_ENDPOINT}?sort_by=-deliveryDate&limit=2&offset=0"
+        )
+
+    async def test_iter_prints_stops_on_short_page(self):
+        """Test that iteration ends after a page smaller than requested."""
+        self.session.get.side_effect = [
+            make_response(200, [{"number": "3"}, {"number": "2"}]),
+            make_response(200, [{"number": "1"}]),
+        ]
+
+        numbers = [
+            item["number"]
+            async for item in self.api.iter_prints("-deliveryDate", page_size=2)
+        ]
+
+        self.assertEqual(numbers, ["3", "2", "1"])
+        self.assertEqual(
+            self.session.get.call_args.args[0],
+            f"{PRINTS_ENDPOINT}?sort_by=-deliveryDate&limit=2&offset=2",
+        )
+
+    async def test_iter_prints_raises_on_error_status(self):
+        """Test that an error page raises SejmApiError."""
+        self.session.get.return_value = make_response(500)
+
+        with self.assertRaises(SejmApiError):
+            async for _ in self.api.iter_prints("-deliveryDate"):
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
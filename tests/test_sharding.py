@@ -0,0 +1,55 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from src.utils.sharding import LocalCoordinator, shard_for
+
+
+class TestShardFor(unittest.TestCase):
+
+    def test_matches_gateway_formula(self):
+        """Test that ids map to shards like the Discord gateway does."""
+        guild_id = 3 << 22
+        self.assertEqual(shard_for(guild_id, 4), 3)
+        self.assertEqual(shard_for(str(guild_id), 2), 1)
+
+
+class TestLocalCoordinator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp_dir.name, "coordinator.sqlite3")
+        self.first = LocalCoordinator(path, lease_seconds=60)
+        self.second = LocalCoordinator(path, lease_seconds=60)
+
+    def tearDown(self):
+        self.first.close()
+        self.second.close()
+        self.tmp_dir.cleanup()
+
+    def test_single_leader(self):
+        """Test that only one process holds the lease at a time."""
+        self.assertTrue(self.first.try_acquire())
+        self.assertFalse(self.second.try_acquire())
+        self.assertTrue(self.first.try_acquire())
+
+    def test_release_hands_over(self):
+        """Test that a released lease is taken by another process."""
+        self.first.try_acquire()
+        self.first.release()
+
+        self.assertFalse(self.first.is_leader)
+        self.assertTrue(self.second.try_acquire())
+
+    def test_expired_lease_is_taken_over(self):
+        """Test that a leader that stopped renewing loses the lease."""
+        self.first.try_acquire()
+
+        with patch("src.utils.sharding.time.time", return_value=time.time() + 61):
+            self.assertTrue(self.second.try_acquire())
+        self.assertFalse(self.first.try_acquire())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+from src.utils.subscriptions import SubscriptionTable
+
+
+class TestSubscriptionTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = SubscriptionTable(
+            {
+                "1": {"100": "2024-01-01", "200": "2024-02-01"},
+                "2": {"100": "2024-01-01"},
+            }
+        )
+
+    def test_reads_like_nested_dict(self):
+        """Test that the table compares equal to the dict it was built from."""
+        self.assertEqual(
+            self.table,
+            {
+                "1": {"100": "2024-01-01", "200": "2024-02-01"},
+                "2": {"100": "2024-01-01"},
+            },
+        )
+        self.assertEqual(self.table["1"]["200"], "2024-02-01")
+        self.assertNotIn("3", self.table)
+
+    def test_set_replaces_date_and_frees_unused_dates(self):
+        """Test that updating a date keeps one subscription and frees old dates."""
+        self.table.set(1, "100", "2024-03-01")
+        self.table.set(2, "100", "2024-03-01")
+
+        self.assertEqual(self.table.user_prints(2), {"100": "2024-03-01"})
+        self.assertNotIn("2024-01-01", self.table._dates)
+
+    def test_dates_are_deduplicated(self):
+        """Test that equal change dates of different prints are stored once."""
+        self.table.set(1, "300", "".join(["2024-", "02-01"]))
+
+        self.assertEqual(len(self.table._dates), 2)
+        self.assertIs(self.table.get_date(1, "300"), self.table.get_date(1, "200"))
+
+    def test_api_dates_are_stored_as_seconds(self):
+        """Test that change dates in the API's format need no date table entry."""
+        self.table.set(1, "300", "2024-03-01T12:30:05")
+        self.table.set(1, "400", "2024-03-01T12:30:05.5")
+
+        self.assertEqual(self.table.get_date(1, "300"), "2024-03-01T12:30:05")
+        self.assertEqual(self.table.get_date(1, "400"), "2024-03-01T12:30:05.5")
+        self.assertNotIn("2024-03-01T12:30:05", self.table._dates)
+        self.assertIn("2024-03-01T12:30:05.5", self.table._dates)
+
+    def test_discard_removes_empty_entries(self):
+        """Test that the last subscription of a user or print leaves nothing behind."""
+        self.assertTrue(self.table.discard(2, "100"))
+        self.assertFalse(self.table.discard(2, "100"))
+
+        self.assertNotIn("2", self.table)
+        self.assertTrue(self.table.discard(1, "200"))
+        self.assertNotIn("200", self.table._prints)
+
+    def test_freed_ids_are_reused(self):
+        """Test that ids of removed prints are given to new ones."""
+        self.table.discard(1, "200")
+        self.table.set(3, "300", "2024-03-01")
+
+        self.assertEqual(len(self.table._print_first_user), 2)
+        self.assertEqual(self.table.print_subscriber_ids("300"), ["3"])
+        self.assertEqual(self.table.print_subscriber_ids("100"), ["1", "2"])
+
+    def test_print_subscribers(self):
+        """Test building the print -> subscribers index."""
+        self.assertEqual(
+            self.table.print_subscribers(),
+            {
+                "100": {"1": "2024-01-01", "2": "2024-01-01"},
+                "200": {"1": "2024-02-01"},
+            },
+        )
+
+    def test_print_subscribers_follow_removals(self):
+        """Test that the index built from the per-print arrays drops removed entries."""
+        self.table.set(2, "100", "2024-03-01")
+        self.table.discard(1, "200")
+
+        self.assertEqual(
+            self.table.print_subscribers(),
+            {"100": {"1": "2024-01-01", "2": "2024-03-01"}},
+        )
+
+    def test_ids_are_four_bytes(self):
+        """Test that a subscription is stored as three 32-bit ids."""
+        self.assertEqual(self.table._user_first_print.itemsize, 4)
+        self.assertEqual(self.table._print_first_user.itemsize, 4)
+        self.assertEqual(self.table._print_first_date.itemsize, 4)
+        self.assertEqual(self.table._print_more_subscribers[0].itemsize, 4)
+
+    def test_single_subscriptions_need_no_arrays(self):
+        """Test that only users and prints with several subscriptions get arrays."""
+        self.assertEqual(list(self.table._user_more_prints), [0])
+        self.assertEqual(list(self.table._print_more_subscribers), [0])
+
+        self.table.discard(1, "100")
+
+        self.assertEqual(self.table._user_more_prints, {})
+        self.assertEqual(self.table._print_more_subscribers, {})
+        self.assertEqual(self.table.user_prints(1), {"200": "2024-02-01"})
+        self.assertEqual(self.table.print_subscriber_ids("100"), ["2"])
+        self.assertEqual(len(self.table["1"]), 1)
+
+    def test_print_subscribers_is_a_lazy_view(self):
+        """Test that the view reads each print's subscribers when looked up."""
+        subscribers = self.table.print_subscribers()
+        self.table.set(3, "100", "2024-03-01")
+
+        self.assertIn("100", subscribers)
+        self.assertNotIn("300", subscribers)
+        self.assertEqual(len(subscribers), 2)
+        self.assertEqual(subscribers["100"]["3"], "2024-03-01")
+        with self.assertRaises(KeyError):
+            subscribers["300"]
+
+    def test_user_view_is_live(self):
+        """Test that changes through a user's view reach the table."""
+        prints = self.table["1"]
+        prints["300"] = "2024-03-01"
+        del prints["100"]
+
+        self.assertEqual(
+            self.table.user_prints(1), {"200": "2024-02-01", "300": "2024-03-01"}
+        )
+        self.assertEqual(self.table.print_subscribers()["100"], {"2": "2024-01-01"})
+
+
+if __name__ == "__main__":
+    unittest.main()
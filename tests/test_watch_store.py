@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.utils import file_operations
+from src.utils.watch_store import SqliteWatchStore
+
+
+class TestSqliteWatchStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "watched.sqlite3")
+        self.store = SqliteWatchStore(self.db_path)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_uses_wal_mode(self):
+        """Test that the database is opened in WAL mode."""
+        (mode,) = self.store._conn.execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual(mode, "wal")
+
+    def test_add_and_get(self):
+        """Test adding watched prints and reading them back."""
+        self.store.add(1, "100", "2024-01-01")
+        self.store.add(1, "200", "2024-02-01")
+        self.store.add(2, "100", "2024-01-01")
+
+        self.assertEqual(
+            self.store.get_user(1), {"100": "2024-01-01", "200": "2024-02-01"}
+        )
+        self.assertEqual(
+            self.store.get_all(),
+            {
+                "1": {"100": "2024-01-01", "200": "2024-02-01"},
+                "2": {"100": "2024-01-01"},
+            },
+        )
+        self.assertEqual(
+            self.store.get_print_subscribers(),
+            {
+                "100": {"1": "2024-01-01", "2": "2024-01-01"},
+                "200": {"1": "2024-02-01"},
+            },
+        )
+
+    def test_remove(self):
+        """Test removing a watched print."""
+        self.store.add(1, "100", "2024-01-01")
+
+        self.assertTrue(self.store.remove(1, "100"))
+        self.assertFalse(self.store.remove(1, "100"))
+        self.assertEqual(self.store.get_user(1), {})
+
+    def test_update_change_date(self):
+        """Test updating the change date only for watched prints."""
+        self.store.add(1, "100", "2024-01-01")
+
+        self.assertTrue(self.store.update_change_date(1, "100", "2024-03-01"))
+        self.assertFalse(self.store.update_change_date(1, "999", "2024-03-01"))
+        self.assertEqual(self.store.get_user(1), {"100": "2024-03-01"})
+
+    def test_migrate_from_json(self):
+        """Test the one-shot import of the legacy JSON file."""
+        json_path = os.path.join(self.tmp_dir.name, "watched_prints.json")
+        with open(json_path, "w") as f:
+            json.dump({"1": {"100": "2024-01-01"}, "2": {"200": "2024-02-01"}}, f)
+
+        imported = self.store.migrate_from_json(json_path)
+
+        self.assertEqual(imported, 2)
+        self.assertFalse(os.path.exists(json_path))
+        self.assertTrue(os.path.exists(f"{json_path}.migrated"))
+        self.assertEqual(
+            self.store.get_all(),
+            {"1": {"100": "2024-01-01"}, "2": {"200": "2024-02-01"}},
+        )
+        self.assertEqual(self.store.migrate_from_json(json_path), 0)
+
+    def test_file_operations_delegate_to_store(self):
+        """Test that file_operations uses the store once one is configured."""
+        file_operations.watched_prints.clear()
+        with patch("src.utils.file_operations._store", self.store):
+            file_operations.add_watched_print(1, "100", "2024-01-01")
+            file_operations.update_print_change_date(1, "100", "2024-02-01")
+
+            self.assertEqual(
+                file_operations.get_user_watched_prints(1), {"100": "2024-02-01"}
+            )
+            self.assertEqual(
+                file_operations.get_print_subscribers(), {"100": {"1": "2024-02-01"}}
+            )
+            self.assertTrue(file_operations.remove_watched_print(1, "100"))
+
+        self.assertEqual(file_operations.watched_prints, {})
+
+    def test_report_channels(self):
+        """Test storing report channels separately per source."""
+        self.assertTrue(self.store.add_report_channel(10, 1, "registered"))
+        self.assertFalse(self.store.add_report_channel(10, 1, "registered"))
+        self.store.set_report_channels({10: 1, 20: 2}, "discovered")
+
+        self.assertEqual(self.store.get_report_channels("registered"), {10: 1})
+        self.assertEqual(self.store.get_report_channels("discovered"), {10: 1, 20: 2})
+
+        self.assertTrue(self.store.remove_report_channel(20, "discovered"))
+        self.assertTrue(self.store.remove_report_channel(10))
+        self.assertEqual(self.store.get_report_channels("registered"), {})
+        self.assertEqual(self.store.get_report_channels("discovered"), {})
+
+    def test_set_report_channels_of_some_guilds(self):
+        """Test that replacing the channels of some guilds keeps the others."""
+        self.store.set_report_channels({10: 1, 20: 2}, "discovered")
+
+        self.store.set_report_channels({30: 1}, "discovered", guild_ids=[1, 3])
+
+        self.assertEqual(self.store.get_report_channels("discovered"), {20: 2, 30: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()